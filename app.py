@@ -2,7 +2,6 @@
 Графический интерфейс генератора мелодий на Tkinter.
 """
 
-import shutil
 import tempfile
 from pathlib import Path
 from tkinter import (
@@ -16,22 +15,28 @@ from tkinter import (
     Label,
     OptionMenu,
     Scale,
+    Scrollbar,
+    Spinbox,
     StringVar,
+    TclError,
     Text,
     Tk,
     filedialog,
 )
 
-from PIL import Image, ImageTk
-
 from src.entities.scale import NOTE_TO_MIDI
 from src.entities.scale import Scale as MusicScale
 from src.entities.scale import ScaleType
 from src.entities.settings import GeneratorSettings
-from src.services.exporter import export_to_midi
+from src.services.editor import MelodyEditor
 from src.services.generator import MelodyGenerator
+from src.services.piano_roll_canvas import PianoRollCanvas
 from src.services.player import play_midi
-from src.services.visualizer import plot_piano_roll, pretty_print_melody
+from src.services.visualizer import (
+    format_note_line,
+    pretty_print_melody,
+    should_use_flats,
+)
 
 
 class MelodyGeneratorApp:
@@ -47,13 +52,17 @@ class MelodyGeneratorApp:
         self.keys = sorted(set(NOTE_TO_MIDI.keys()))
         self.scales = [s.value for s in ScaleType]
         self.current_midi_path = None
-        self.photo_image = None
+        self.current_key = "C"
+        self.current_scale_name = "major"
+        self.editor = None
 
         self.key_var = StringVar(value="C")
         self.scale_var = StringVar(value="major")
         self.length_var = IntVar(value=8)
         self.tempo_var = IntVar(value=120)
         self.octave_var = IntVar(value=1)
+        self.edit_from_var = IntVar(value=1)
+        self.edit_to_var = IntVar(value=1)
 
         self._create_ui()
 
@@ -234,14 +243,19 @@ class MelodyGeneratorApp:
         self.image_frame.pack(fill="both", expand=True, pady=(0, 10))
         self.image_frame.pack_propagate(False)
 
-        self.image_label = Label(
-            self.image_frame,
-            text="Пиано-ролл",
-            font=("Helvetica", 14),
-            fg="#71717a",
-            bg="#252538",
+        # Колесо мыши прокручивает пиано-ролл, Ctrl + колесо — масштабирует
+        self.roll_scrollbar = Scrollbar(
+            self.image_frame, orient=HORIZONTAL, command=self._scroll_roll
         )
-        self.image_label.pack(expand=True)
+        self.roll_scrollbar.pack(side="bottom", fill="x")
+
+        self.piano_roll = PianoRollCanvas(self.image_frame)
+        self.piano_roll.pack(fill="both", expand=True)
+        self.piano_roll.on_view_change = lambda: self.roll_scrollbar.set(
+            *self.piano_roll.view_fraction()
+        )
+
+        self._create_edit_bar(parent)
 
         text_frame = Frame(parent, bg="#252538")
         text_frame.pack(fill="x")
@@ -278,10 +292,11 @@ class MelodyGeneratorApp:
 
         generator = MelodyGenerator(scale, settings)
         melody = generator.generate()
+        self.editor = MelodyEditor(melody, generator, tempo=tempo)
 
-        dur = melody.total_duration()
-        info_text = f"{key} {self.scale_var.get()} | {tempo}bpm | {dur:.1f} долей"
-        self.info_label.config(text=info_text, fg="#e4e4e7")
+        self.current_key = key
+        self.current_scale_name = self.scale_var.get()
+        self._update_info(melody)
 
         text_output = pretty_print_melody(melody, key=key)
         self.melody_text.config(state=NORMAL)
@@ -289,37 +304,171 @@ class MelodyGeneratorApp:
         self.melody_text.insert("1.0", text_output)
         self.melody_text.config(state=DISABLED)
 
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmp:
-            img_path = tmp.name
-
-        plot_piano_roll(
-            melody,
-            key=key,
-            scale_name=self.scale_var.get(),
-            output_path=img_path,
-            show=False,
+        self.piano_roll.set_melody(
+            melody, self.editor.onsets, key=key, scale_name=self.scale_var.get()
         )
 
-        img = Image.open(img_path)
-        frame_width = self.image_frame.winfo_width() - 20
-        frame_height = self.image_frame.winfo_height() - 20
-        if frame_width > 100 and frame_height > 100:
-            img.thumbnail((frame_width, frame_height), Image.Resampling.LANCZOS)
+        for spinbox in self.edit_spinboxes:
+            spinbox.config(to=length)
+        self.edit_from_var.set(1)
+        self.edit_to_var.set(1)
 
-        self.photo_image = ImageTk.PhotoImage(img)
-        self.image_label.config(image=self.photo_image, text="")
+        self.play_btn.config(state=NORMAL)
+        self.save_btn.config(state=NORMAL)
+        for button in self.edit_buttons:
+            button.config(state=NORMAL)
 
-        with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp:
-            self.current_midi_path = tmp.name
+    def _update_info(self, melody):
+        """Обновление строки с параметрами мелодии."""
+        tempo = self.editor.tempo
+        dur = melody.total_duration()
+        info_text = (
+            f"{self.current_key} {self.current_scale_name} | {tempo}bpm | "
+            f"{dur:.1f} долей"
+        )
+        self.info_label.config(text=info_text, fg="#e4e4e7")
 
-        export_to_midi(melody, self.current_midi_path, tempo=tempo)
+    def _scroll_roll(self, action, value, units=None):
+        """Прокрутка пиано-ролла полосой прокрутки."""
+        view = self.piano_roll
+        if action == "moveto":
+            view.set_view(float(value) * view.total_duration, view.view_width)
+        elif action == "scroll":
+            step = view.view_width
+            if units != "pages":
+                step *= view.SCROLL_STEP
+            view.scroll(int(value) * step)
+
+    def _create_edit_bar(self, parent):
+        """Создание панели редактирования отдельных нот."""
+        bar = Frame(parent, bg="#252538")
+        bar.pack(fill="x", pady=(0, 10))
 
-        self.play_btn.config(state=NORMAL)
-        self.save_btn.config(state=NORMAL)
+        Label(
+            bar,
+            text="Ноты с",
+            font=("Helvetica", 11),
+            fg="#a1a1aa",
+            bg="#252538",
+        ).pack(side="left", padx=(10, 5), pady=5)
+
+        self.edit_spinboxes = []
+        for variable, text in ((self.edit_from_var, "по"), (self.edit_to_var, "")):
+            spinbox = Spinbox(
+                bar,
+                from_=1,
+                to=1,
+                width=5,
+                textvariable=variable,
+                font=("Helvetica", 11),
+                bg="#374151",
+                fg="white",
+                relief="flat",
+            )
+            spinbox.pack(side="left", pady=5)
+            self.edit_spinboxes.append(spinbox)
+            if text:
+                Label(
+                    bar,
+                    text=text,
+                    font=("Helvetica", 11),
+                    fg="#a1a1aa",
+                    bg="#252538",
+                ).pack(side="left", padx=5)
+
+        actions = [
+            ("Перегенерировать", self._regenerate_notes),
+            ("Закрепить", self._lock_notes),
+            ("Открепить", self._unlock_notes),
+            ("▲", lambda: self._transpose_notes(1)),
+            ("▼", lambda: self._transpose_notes(-1)),
+            ("+8ва", lambda: self._transpose_notes(12)),
+            ("-8ва", lambda: self._transpose_notes(-12)),
+        ]
+        self.edit_buttons = []
+        for text, command in actions:
+            button = Button(
+                bar,
+                text=text,
+                font=("Helvetica", 11),
+                bg="#374151",
+                fg="#a78bfa",
+                activebackground="#4b5563",
+                activeforeground="white",
+                relief="flat",
+                cursor="hand2",
+                state=DISABLED,
+                command=command,
+            )
+            button.pack(side="left", padx=(5, 0), pady=5)
+            self.edit_buttons.append(button)
+
+    def _edit_range(self):
+        """Возвращает выбранный диапазон нот как полуинтервал индексов."""
+        try:
+            first = self.edit_from_var.get()
+            last = self.edit_to_var.get()
+        except TclError:
+            return None
+        first, last = sorted((first, last))
+        first = min(max(first, 1), len(self.editor))
+        last = min(max(last, 1), len(self.editor))
+        return first - 1, last
+
+    def _regenerate_notes(self):
+        """Перегенерация выбранных нот."""
+        span = self._edit_range()
+        if span:
+            self._refresh(self.editor.regenerate(*span))
+
+    def _transpose_notes(self, semitones):
+        """Транспонирование выбранных нот."""
+        span = self._edit_range()
+        if span:
+            self._refresh(self.editor.transpose(*span, semitones))
+
+    def _lock_notes(self):
+        """Закрепление выбранных нот."""
+        span = self._edit_range()
+        if span:
+            self.editor.lock(*span)
+
+    def _unlock_notes(self):
+        """Снятие закрепления с выбранных нот."""
+        span = self._edit_range()
+        if span:
+            self.editor.unlock(*span)
+
+    def _refresh(self, result):
+        """Обновление отображения только для изменённых нот."""
+        melody = self.editor.melody
+        stop = len(melody.notes) if result.shifted else result.stop
+        self.piano_roll.update_notes(melody, result.start, stop)
+
+        # Строки нот в тексте начинаются с третьей (после заголовка)
+        use_flats = should_use_flats(self.current_key)
+        self.melody_text.config(state=NORMAL)
+        for i in range(result.start, result.stop):
+            line = i + 3
+            self.melody_text.delete(f"{line}.0", f"{line}.end")
+            self.melody_text.insert(
+                f"{line}.0", format_note_line(melody.notes[i], use_flats)
+            )
+        if result.shifted:
+            total = round(melody.total_duration(), 2)
+            self.melody_text.delete("end-1c linestart", "end-1c")
+            self.melody_text.insert("end-1c", f"Общая длительность: {total} долей")
+            self._update_info(melody)
+        self.melody_text.config(state=DISABLED)
 
     def _play_melody(self):
         """Воспроизведение сгенерированной мелодии."""
-        if self.current_midi_path:
+        if self.editor is not None:
+            # MIDI файл для pygame создаётся только при воспроизведении
+            if self.current_midi_path is None:
+                with tempfile.NamedTemporaryFile(suffix=".mid", delete=False) as tmp:
+                    self.current_midi_path = tmp.name
+            self.editor.save_midi(self.current_midi_path)
             self.play_btn.config(text="Играет...")
             self.root.update()
             try:
@@ -329,14 +478,14 @@ class MelodyGeneratorApp:
 
     def _save_midi(self):
         """Сохранение MIDI файла."""
-        if self.current_midi_path:
+        if self.editor is not None:
             filename = filedialog.asksaveasfilename(
                 defaultextension=".mid",
                 filetypes=[("MIDI файлы", "*.mid"), ("Все файлы", "*.*")],
                 initialfile=f"мелодия_{self.key_var.get()}_{self.scale_var.get()}.mid",
             )
             if filename:
-                shutil.copy(self.current_midi_path, filename)
+                self.editor.save_midi(filename)
                 self.info_label.config(text=f"Сохранено: {Path(filename).name}")
 
     def run(self):
@@ -1,12 +1,22 @@
 """
 Консольный интерфейс генератора мелодий.
+
+Запуск без аргументов — интерактивная генерация одной мелодии,
+`python main.py sweep --help` — перебор параметров,
+`python main.py batch --help` — пакетный экспорт через конвейер.
 """
 
+import argparse
+import sys
+
 from src.entities.scale import NOTE_TO_MIDI, Scale, ScaleType
 from src.entities.settings import GeneratorSettings
 from src.services.exporter import export_to_midi
 from src.services.generator import MelodyGenerator
+from src.services.melody_files import MelodySpec
+from src.services.pipeline import ExportJob, export_batch
 from src.services.player import play_midi
+from src.services.sweep import expand_grid, run_sweep
 from src.services.visualizer import plot_piano_roll, pretty_print_melody
 
 
@@ -139,5 +149,113 @@ def main():
         print("Воспроизведение завершено.")
 
 
+def parse_list(value: str, cast=str) -> list:
+    """Разбирает список через запятую; для чисел поддерживает диапазоны a-b."""
+    items = []
+    for part in value.split(","):
+        part = part.strip()
+        if cast is int and "-" in part:
+            start, end = part.split("-", 1)
+            items.extend(range(int(start), int(end) + 1))
+        else:
+            items.append(cast(part))
+    return items
+
+
+def sweep_main(argv: list) -> None:
+    """Перебор параметров с пропуском неизменившихся ячеек."""
+    parser = argparse.ArgumentParser(
+        prog="main.py sweep",
+        description="Генерация мелодий для всех комбинаций параметров",
+    )
+    parser.add_argument("--keys", default="C", help="Тональности или all")
+    parser.add_argument("--scales", default="major", help="Гаммы или all")
+    parser.add_argument("--tempos", default="120", help="Темпы, например 90,120")
+    parser.add_argument("--octaves", default="0", help="Диапазоны октав, 0-2")
+    parser.add_argument("--seeds", default="0", help="Зёрна, например 0-99")
+    parser.add_argument("--length", type=int, default=8, help="Количество нот")
+    parser.add_argument("--out", default="sweep_output", help="Каталог результатов")
+    parser.add_argument("--workers", type=int, default=None, help="Число процессов")
+    parser.add_argument("--png", action="store_true", help="Рисовать пиано-роллы")
+    parser.add_argument("--force", action="store_true", help="Пересчитать всё")
+    args = parser.parse_args(argv)
+
+    keys = sorted(set(NOTE_TO_MIDI)) if args.keys == "all" else parse_list(args.keys)
+    scales = (
+        [s.value for s in ScaleType]
+        if args.scales == "all"
+        else parse_list(args.scales)
+    )
+    cells = expand_grid(
+        keys,
+        scales,
+        parse_list(args.tempos, int),
+        parse_list(args.octaves, int),
+        parse_list(args.seeds, int),
+        length=args.length,
+    )
+
+    report = run_sweep(
+        cells, args.out, workers=args.workers, render_png=args.png, force=args.force
+    )
+    print(f"Ячеек: {len(cells)}")
+    print(f"Пересчитано: {len(report.run)}, пропущено: {len(report.skipped)}")
+    print(f"Время: {report.seconds:.2f} с")
+    print(f"Манифест: {report.manifest_path}")
+
+
+def batch_main(argv: list) -> None:
+    """Пакетная генерация и экспорт мелодий через конвейер стадий."""
+    parser = argparse.ArgumentParser(
+        prog="main.py batch",
+        description="Генерация пакета мелодий с экспортом в MIDI, текст и PNG",
+    )
+    parser.add_argument("--key", default="C", help="Тональность")
+    parser.add_argument("--scale", default="major", help="Тип гаммы")
+    parser.add_argument("--seeds", default="0-99", help="Зёрна, например 0-99")
+    parser.add_argument("--length", type=int, default=8, help="Количество нот")
+    parser.add_argument("--octaves", type=int, default=0, help="Диапазон октав")
+    parser.add_argument("--tempo", type=int, default=120, help="Темп в BPM")
+    parser.add_argument("--out", default="batch_output", help="Каталог результатов")
+    parser.add_argument("--io-workers", type=int, default=2, help="Потоков записи")
+    parser.add_argument("--workers", type=int, default=None, help="Процессов PNG")
+    parser.add_argument("--no-png", action="store_true", help="Не рисовать PNG")
+    args = parser.parse_args(argv)
+
+    jobs = (
+        ExportJob(
+            MelodySpec(
+                key=args.key,
+                scale=args.scale,
+                tempo=args.tempo,
+                octave_range=args.octaves,
+                seed=seed,
+                length=args.length,
+            )
+        )
+        for seed in parse_list(args.seeds, int)
+    )
+    report = export_batch(
+        jobs,
+        args.out,
+        render_png=not args.no_png,
+        io_workers=args.io_workers,
+        render_workers=args.workers,
+    )
+
+    print(f"Мелодий: {report.count}, время: {report.seconds:.2f} с")
+    print(f"{'Стадия':<10}{'готово':>8}{'в сек.':>10}{'занято, с':>12}{'очередь':>10}")
+    for stats in report.stats.values():
+        print(
+            f"{stats.name:<10}{stats.processed:>8}{stats.throughput:>10.1f}"
+            f"{stats.busy:>12.2f}{stats.max_queue:>10}"
+        )
+
+
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "sweep":
+        sweep_main(sys.argv[2:])
+    elif len(sys.argv) > 1 and sys.argv[1] == "batch":
+        batch_main(sys.argv[2:])
+    else:
+        main()
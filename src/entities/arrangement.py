@@ -0,0 +1,46 @@
+"""
+Сущности многоголосной аранжировки.
+"""
+
+from dataclasses import dataclass
+from typing import List
+
+from .melody import Melody
+
+
+@dataclass
+class Voice:
+    """
+    Отдельный голос аранжировки.
+
+    Attributes:
+        name: Название голоса (например, "melody", "bass", "chord_1")
+        melody: Последовательность нот голоса
+        channel: MIDI канал (0-15)
+        program: Номер инструмента General MIDI (0-127)
+        velocity: Громкость нот голоса (0-127)
+    """
+
+    name: str
+    melody: Melody
+    channel: int = 0
+    program: int = 0
+    velocity: int = 64
+
+
+@dataclass
+class Arrangement:
+    """
+    Многоголосная аранжировка: голоса звучат одновременно с начала.
+
+    Attributes:
+        voices: Голоса аранжировки
+    """
+
+    voices: List[Voice]
+
+    def total_duration(self) -> float:
+        """
+        Вычисляет длительность самого длинного голоса в долях.
+        """
+        return max((v.melody.total_duration() for v in self.voices), default=0.0)
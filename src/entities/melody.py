@@ -2,25 +2,282 @@
 Сущность мелодии — последовательность нот.
 """
 
-from dataclasses import dataclass
-from typing import List
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
 
 from .note import Note
 
+MIDI_MIN_PITCH = 0
+MIDI_MAX_PITCH = 127
+
+
+def _frozen(array: np.ndarray) -> np.ndarray:
+    """Возвращает представление массива только для чтения (без копирования)."""
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
 
-@dataclass
 class Melody:
     """
     Сгенерированная мелодия.
 
+    Мелодия хранится либо списком нот, либо массивами высот и длительностей.
+    Преобразования (transpose, invert, retrograde, augment, срезы, concat)
+    работают над массивами и возвращают новые мелодии: срезы и ракоход —
+    представления исходных массивов, транспонирование — сдвиг, который
+    применяется при чтении высот. Данные копируются, только когда это
+    неизбежно (инверсия, склейка) или когда запрошен список нот.
+
+    Список нот и массивы строятся друг из друга по первому запросу и
+    кэшируются вместе с общей длительностью; чтение notes не отменяет
+    массивы. Если список нот изменён на месте, нужно вызвать invalidate(),
+    чтобы сбросить кэш.
+
     Attributes:
         notes: Последовательность нот
     """
 
-    notes: List[Note]
+    def __init__(self, notes: Optional[List[Note]] = None):
+        """
+        Args:
+            notes: Последовательность нот
+        """
+        self._notes: Optional[List[Note]] = notes if notes is not None else []
+        self._pitches: Optional[np.ndarray] = None
+        self._durations: Optional[np.ndarray] = None
+        self._offset = 0
+        self._total: Optional[float] = None
+
+    @classmethod
+    def from_arrays(cls, pitches, durations) -> "Melody":
+        """
+        Создаёт мелодию из массивов высот и длительностей без копирования.
+
+        Массивы не должны изменяться после передачи.
+
+        Args:
+            pitches: Целочисленные MIDI номера нот
+            durations: Длительности нот в долях
+
+        Raises:
+            ValueError: Если массивы разной длины, не одномерные или высоты
+                вне диапазона MIDI
+        """
+        pitches = np.asarray(pitches)
+        durations = np.asarray(durations, dtype=float)
+        if pitches.ndim != 1 or pitches.shape != durations.shape:
+            raise ValueError(
+                f"Ожидаются одномерные массивы одной длины: "
+                f"{pitches.shape} и {durations.shape}"
+            )
+        if pitches.size and pitches.dtype.kind not in "iu":
+            raise ValueError(f"Высоты должны быть целыми: {pitches.dtype}")
+        if pitches.size and (
+            pitches.min() < MIDI_MIN_PITCH or pitches.max() > MIDI_MAX_PITCH
+        ):
+            raise ValueError(
+                f"Высоты вне диапазона MIDI ({MIDI_MIN_PITCH}-{MIDI_MAX_PITCH})"
+            )
+        return cls._view(_frozen(pitches), _frozen(durations))
+
+    @classmethod
+    def _view(
+        cls,
+        pitches: np.ndarray,
+        durations: np.ndarray,
+        offset: int = 0,
+        total: Optional[float] = None,
+    ) -> "Melody":
+        melody = cls.__new__(cls)
+        melody._notes = None
+        melody._pitches = pitches
+        melody._durations = durations
+        melody._offset = offset
+        melody._total = total
+        return melody
+
+    @property
+    def notes(self) -> List[Note]:
+        """
+        Список нот (при первом обращении строится из массивов). После
+        изменения списка на месте нужно вызвать invalidate().
+        """
+        if self._notes is None:
+            self._notes = list(self._iter_chunks())
+        return self._notes
+
+    @notes.setter
+    def notes(self, notes: List[Note]) -> None:
+        self._notes = notes
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает массивы и длительность, построенные из списка нот.
+        Вызывается после изменения списка notes на месте; у мелодии без
+        списка нот ничего не делает.
+        """
+        if self._notes is None:
+            return
+        self._pitches = self._durations = self._total = None
+        self._offset = 0
+
+    def _arrays(self) -> Tuple[np.ndarray, np.ndarray, int]:
+        """Возвращает высоты без сдвига, длительности и сдвиг (с кэшем)."""
+        if self._pitches is None:
+            count = len(self._notes)
+            pitches = np.fromiter((n.pitch for n in self._notes), np.int64, count)
+            durations = np.fromiter((n.duration for n in self._notes), float, count)
+            pitches = np.clip(pitches, MIDI_MIN_PITCH, MIDI_MAX_PITCH)
+            self._pitches, self._durations = _frozen(pitches), _frozen(durations)
+            self._offset = 0
+        return self._pitches, self._durations, self._offset
+
+    def __iter__(self) -> Iterator[Note]:
+        """
+        Перебирает ноты, не переводя мелодию в списочный режим; в режиме
+        массивов ноты строятся порциями, без копии всей мелодии.
+        """
+        if self._notes is not None:
+            return iter(self._notes)
+        return self._iter_chunks()
+
+    def _iter_chunks(self, size: int = 4096) -> Iterator[Note]:
+        pitches, durations, offset = self._arrays()
+        for start in range(0, len(pitches), size):
+            stop = start + size
+            chunk = Melody._view(pitches[start:stop], durations[start:stop], offset)
+            for pitch, duration in zip(
+                chunk.pitches.tolist(), chunk.durations.tolist()
+            ):
+                yield Note(pitch=pitch, duration=duration)
+
+    @property
+    def pitches(self) -> np.ndarray:
+        """Высоты нот (массив только для чтения)."""
+        pitches, _, offset = self._arrays()
+        if offset == 0:
+            return pitches
+        shifted = np.add(pitches, offset, dtype=np.int64)
+        return _frozen(np.clip(shifted, MIDI_MIN_PITCH, MIDI_MAX_PITCH, out=shifted))
+
+    @property
+    def durations(self) -> np.ndarray:
+        """Длительности нот (массив только для чтения)."""
+        return self._arrays()[1]
+
+    def __len__(self) -> int:
+        if self._notes is not None:
+            return len(self._notes)
+        return len(self._pitches)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Note, "Melody"]:
+        """
+        Возвращает ноту по индексу или мелодию-срез (представление без
+        копирования, шаг среза поддерживается).
+        """
+        if not isinstance(index, slice):
+            if self._notes is not None:
+                return self._notes[index]
+            pitch = int(self._pitches[index]) + self._offset
+            return Note(
+                pitch=min(max(pitch, MIDI_MIN_PITCH), MIDI_MAX_PITCH),
+                duration=float(self._durations[index]),
+            )
+        if self._pitches is None:
+            # Массивы строятся только для нот среза
+            pitches, durations, _ = Melody(self._notes[index])._arrays()
+            return Melody._view(pitches, durations)
+        pitches, durations, offset = self._arrays()
+        return Melody._view(pitches[index], durations[index], offset)
+
+    def __add__(self, other: "Melody") -> "Melody":
+        return Melody.concat([self, other])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Melody):
+            return NotImplemented
+        return np.array_equal(self.pitches, other.pitches) and np.array_equal(
+            self.durations, other.durations
+        )
+
+    def __repr__(self) -> str:
+        return f"Melody(notes={list(self)!r})"
 
     def total_duration(self) -> float:
         """
         Вычисляет сумму длительностей всех нот в долях.
+
+        Результат кэшируется до invalidate().
+        """
+        if self._total is None:
+            if self._pitches is None:
+                self._total = sum(n.duration for n in self._notes)
+            else:
+                self._total = float(self._durations.sum())
+        return self._total
+
+    def transpose(self, semitones: int) -> "Melody":
         """
-        return sum(n.duration for n in self.notes)
+        Транспонирует мелодию за O(1): сдвиг применяется при чтении высот
+        и ограничивается диапазоном MIDI (0-127). Сдвиги накапливаются,
+        поэтому транспонирование туда и обратно не теряет нот у границ.
+
+        Args:
+            semitones: Сдвиг в полутонах (отрицательный — вниз)
+        """
+        pitches, durations, offset = self._arrays()
+        return Melody._view(pitches, durations, offset + semitones, self._total)
+
+    def invert(self, axis: int) -> "Melody":
+        """
+        Обращает интервалы относительно оси: высота p становится 2 * axis - p
+        (с ограничением диапазоном MIDI). Длительности не копируются.
+
+        Args:
+            axis: MIDI номер оси инверсии
+        """
+        inverted = np.subtract(2 * axis, self.pitches, dtype=np.int64)
+        np.clip(inverted, MIDI_MIN_PITCH, MIDI_MAX_PITCH, out=inverted)
+        return Melody._view(_frozen(inverted), self.durations, 0, self._total)
+
+    def retrograde(self) -> "Melody":
+        """Возвращает мелодию в обратном порядке (представление)."""
+        pitches, durations, offset = self._arrays()
+        return Melody._view(pitches[::-1], durations[::-1], offset, self._total)
+
+    def augment(self, factor: float = 2.0) -> "Melody":
+        """
+        Увеличивает длительности в factor раз (factor < 1 — уменьшение).
+
+        Raises:
+            ValueError: Если factor не положителен
+        """
+        if factor <= 0:
+            raise ValueError(f"Множитель длительностей должен быть > 0: {factor}")
+        pitches, durations, offset = self._arrays()
+        total = None if self._total is None else self._total * factor
+        return Melody._view(pitches, _frozen(durations * factor), offset, total)
+
+    def diminish(self, factor: float = 2.0) -> "Melody":
+        """
+        Уменьшает длительности в factor раз.
+
+        Raises:
+            ValueError: Если factor не положителен
+        """
+        if factor <= 0:
+            raise ValueError(f"Делитель длительностей должен быть > 0: {factor}")
+        return self.augment(1 / factor)
+
+    @staticmethod
+    def concat(melodies: Iterable["Melody"]) -> "Melody":
+        """Склеивает мелодии в одну (массивы копируются один раз)."""
+        melodies = list(melodies)
+        if not melodies:
+            return Melody.from_arrays(np.empty(0, dtype=np.int64), np.empty(0))
+        pitches = np.concatenate([m.pitches for m in melodies])
+        durations = np.concatenate([m.durations for m in melodies])
+        return Melody._view(_frozen(pitches), _frozen(durations))
@@ -2,9 +2,9 @@
 Сущности для работы с музыкальными гаммами.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 
 class ScaleType(Enum):
@@ -50,15 +50,64 @@ NOTE_TO_MIDI: Dict[str, int] = {
 }
 
 
+# Название тональности для каждого звуковысотного класса (0 = C)
+PITCH_CLASS_KEYS: List[str] = [
+    "C",
+    "C#",
+    "D",
+    "Eb",
+    "E",
+    "F",
+    "F#",
+    "G",
+    "Ab",
+    "A",
+    "Bb",
+    "B",
+]
+
+FULL_MASK = 0xFFF
+
+
+def pitch_class_mask(pitches: Iterable[int]) -> int:
+    """
+    Возвращает 12-битную маску звуковысотных классов (бит i — класс i, 0 = C).
+
+    Args:
+        pitches: MIDI номера нот или интервалы от C
+    """
+    mask = 0
+    for pitch in pitches:
+        mask |= 1 << (pitch % 12)
+    return mask
+
+
+def rotate_mask(mask: int, semitones: int) -> int:
+    """Транспонирует маску звуковысотных классов на semitones вверх."""
+    semitones %= 12
+    return ((mask << semitones) | (mask >> (12 - semitones))) & FULL_MASK
+
+
 @dataclass
 class Scale:
     """
     root: Корневая нота гаммы как MIDI номер (например, 60 = C4)
     intervals: Интервальная формула гаммы
+    mask: 12-битная маска звуковысотных классов гаммы
     """
 
     root: int
     intervals: List[int]
+    mask: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        self.mask = pitch_class_mask(self.root + i for i in self.intervals)
+
+    def contains(self, pitch: int) -> bool:
+        """
+        Проверяет, принадлежит ли нота гамме (в любой октаве), за O(1).
+        """
+        return bool(self.mask >> (pitch % 12) & 1)
 
     @classmethod
     def from_key(cls, key: str, scale_type: ScaleType = ScaleType.MAJOR) -> "Scale":
@@ -83,3 +132,11 @@ class Scale:
         root = NOTE_TO_MIDI[key_upper]
         intervals = SCALE_INTERVALS[scale_type]
         return cls(root=root, intervals=intervals)
+
+
+# Маски всех гамм от каждого из 12 звуковысотных классов
+SCALE_MASKS: Dict[Tuple[int, ScaleType], int] = {
+    (root, scale_type): rotate_mask(pitch_class_mask(intervals), root)
+    for root in range(12)
+    for scale_type, intervals in SCALE_INTERVALS.items()
+}
@@ -3,7 +3,7 @@
 """
 
 from dataclasses import dataclass
-from typing import List
+from typing import Dict, List, Optional
 
 
 @dataclass
@@ -11,12 +11,74 @@ class GeneratorSettings:
     """
     Настройки для генерации мелодии.
 
+    Веса задаются словарём «значение → вес»; значения без веса получают
+    вес 1, а без словаря выбор равновероятный.
+
     Attributes:
         length: Количество нот в мелодии
         allowed_durations: Допустимые длительности нот (в долях такта)
         octave_range: Диапазон октав (+/- от корневой ноты)
+        degree_weights: Веса ступеней гаммы по индексу (0 — тоника),
+            например {0: 3.0, 4: 2.0} для тоники и квинты мажора
+        octave_weights: Веса сдвигов октавы (от -octave_range до octave_range)
+        duration_weights: Веса длительностей из allowed_durations,
+            например {0.5: 3.0} для преобладания восьмых
     """
 
     length: int
     allowed_durations: List[float]
     octave_range: int
+    degree_weights: Optional[Dict[int, float]] = None
+    octave_weights: Optional[Dict[int, float]] = None
+    duration_weights: Optional[Dict[float, float]] = None
+
+
+@dataclass
+class ArrangementSettings:
+    """
+    Настройки для построения аккомпанемента к мелодии.
+
+    Attributes:
+        chord_duration: Длительность одного аккорда (в долях такта)
+        chord_size: Количество голосов в аккорде
+        chord_octave: Сдвиг аккордов в октавах относительно корневой ноты
+        bass_octave: Сдвиг баса в октавах относительно корневой ноты
+    """
+
+    chord_duration: float = 2.0
+    chord_size: int = 3
+    chord_octave: int = -1
+    bass_octave: int = -2
+
+
+@dataclass
+class SearchSettings:
+    """
+    Настройки поиска мелодий генетическим алгоритмом.
+
+    Attributes:
+        population: Размер популяции
+        generations: Максимальное количество поколений
+        elite: Сколько лучших мелодий переходит в следующее поколение без
+            изменений
+        tournament: Размер турнира при выборе родителей
+        mutation_rate: Вероятность заменить ноту потомка случайной нотой гаммы
+        target: Оценка, при достижении которой поиск останавливается
+        max_step: Наибольший интервал (в полутонах), считающийся плавным ходом
+        max_range: Допустимый диапазон мелодии в полутонах
+        step_weight: Вес доли плавных ходов в оценке
+        tonic_weight: Вес окончания на тонике в оценке
+        range_weight: Вес соблюдения диапазона в оценке
+    """
+
+    population: int = 64
+    generations: int = 50
+    elite: int = 4
+    tournament: int = 3
+    mutation_rate: float = 0.1
+    target: float = 1.0
+    max_step: int = 2
+    max_range: int = 12
+    step_weight: float = 1.0
+    tonic_weight: float = 1.0
+    range_weight: float = 1.0
@@ -0,0 +1,124 @@
+"""
+Построение многоголосной аранжировки: мелодия, бас и аккорды.
+"""
+
+import math
+from typing import List, Optional
+
+from ..entities.arrangement import Arrangement, Voice
+from ..entities.melody import Melody
+from ..entities.note import Note
+from ..entities.scale import Scale
+from ..entities.settings import ArrangementSettings, GeneratorSettings
+from .generator import MelodyGenerator
+
+
+class ArrangementGenerator:
+    """
+    Генератор аранжировок на основе гаммы.
+
+    Аккорды строятся терциями от случайной ступени той же гаммы, из которой
+    взята мелодия; бас играет основной тон каждого аккорда.
+    """
+
+    def __init__(
+        self,
+        scale: Scale,
+        settings: GeneratorSettings,
+        arrangement_settings: Optional[ArrangementSettings] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Инициализация генератора.
+
+        Args:
+            scale: Музыкальная гамма
+            settings: Настройки генерации мелодии
+            arrangement_settings: Настройки аккомпанемента
+            seed: Зерно генератора случайных чисел
+        """
+        self.scale = scale
+        self.settings = settings
+        self.arrangement_settings = arrangement_settings or ArrangementSettings()
+        self.melody_generator = MelodyGenerator(scale, settings, seed=seed)
+
+    def generate(self) -> Arrangement:
+        """
+        Генерирует новую мелодию и аккомпанемент к ней.
+        """
+        return self.arrange(self.melody_generator.generate())
+
+    def arrange(self, melody: Melody) -> Arrangement:
+        """
+        Строит аккомпанемент к готовой мелодии.
+
+        Args:
+            melody: Мелодия верхнего голоса
+
+        Returns:
+            Аранжировка из мелодии, баса и голосов аккорда; у пустой
+            мелодии голоса баса и аккорда тоже пусты
+        """
+        opts = self.arrangement_settings
+        total = melody.total_duration()
+        count = math.ceil(total / opts.chord_duration) if total > 0 else 0
+
+        # Последний аккорд обрезается по концу мелодии
+        durations = [opts.chord_duration] * count
+        if count:
+            durations[-1] = total - opts.chord_duration * (count - 1)
+
+        rng = self.melody_generator.rng
+        degrees = [rng.randrange(len(self.scale.intervals)) for _ in range(count)]
+        chords = [self.chord_pitches(d, opts.chord_octave) for d in degrees]
+
+        bass_root = self.scale.root + 12 * opts.bass_octave
+        bass = Melody(
+            [
+                Note(pitch=bass_root + self.scale.intervals[d], duration=dur)
+                for d, dur in zip(degrees, durations)
+            ]
+        )
+
+        voices = [
+            Voice(name="melody", melody=melody, channel=0, program=0, velocity=80),
+            Voice(name="bass", melody=bass, channel=1, program=32, velocity=70),
+        ]
+        for i in range(opts.chord_size):
+            chord_voice = Melody(
+                [
+                    Note(pitch=chord[i], duration=dur)
+                    for chord, dur in zip(chords, durations)
+                ]
+            )
+            voices.append(
+                Voice(
+                    name=f"chord_{i + 1}",
+                    melody=chord_voice,
+                    channel=2,
+                    program=48,
+                    velocity=50,
+                )
+            )
+
+        return Arrangement(voices)
+
+    def chord_pitches(self, degree: int, octave: int = 0) -> List[int]:
+        """
+        Возвращает MIDI номера аккорда, построенного терциями от ступени гаммы.
+
+        Args:
+            degree: Индекс ступени гаммы (с нуля)
+            octave: Сдвиг в октавах относительно корневой ноты
+
+        Returns:
+            Список высот от нижнего голоса к верхнему
+        """
+        intervals = self.scale.intervals
+        steps = len(intervals)
+        pitches = []
+        for i in range(self.arrangement_settings.chord_size):
+            index = degree + 2 * i
+            pitch = intervals[index % steps] + 12 * (index // steps)
+            pitches.append(self.scale.root + 12 * octave + pitch)
+        return pitches
@@ -0,0 +1,224 @@
+"""
+Пакетная отрисовка мелодий в контактные листы — сетки миниатюр пиано-роллов.
+
+Миниатюры рисуются параллельно в пуле процессов. Каждый процесс один раз
+создаёт свой холст Agg и переиспользует его, не затрагивая глобальное
+состояние pyplot. Число задач в работе ограничено, а листы записываются
+по мере заполнения, поэтому память не растёт с размером пакета.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PolyCollection
+from matplotlib.colors import to_rgba
+from matplotlib.figure import Figure
+from PIL import Image
+
+from ..entities.melody import Melody
+
+BACKGROUND_COLOR = "#16213e"
+AXES_COLOR = "#1a1a2e"
+
+
+@dataclass
+class SheetItem:
+    """
+    Мелодия для контактного листа.
+
+    Attributes:
+        melody: Мелодия
+        key: Тональность (для подписи)
+        scale_name: Название гаммы (для подписи)
+        seed: Зерно, с которым сгенерирована мелодия (для подписи)
+    """
+
+    melody: Melody
+    key: str = "C"
+    scale_name: str = "major"
+    seed: Optional[int] = None
+
+    def caption(self) -> str:
+        """Возвращает подпись миниатюры."""
+        text = f"{self.key} {self.scale_name}"
+        if self.seed is not None:
+            text += f" · seed {self.seed}"
+        return text
+
+
+# Холст процесса-исполнителя, создаётся в _init_worker
+_canvas: Optional[FigureCanvasAgg] = None
+
+
+def _init_worker(tile_size: Tuple[int, int], dpi: int) -> None:
+    """Создаёт холст Agg, который процесс переиспользует для всех миниатюр."""
+    global _canvas
+    width, height = tile_size
+    figure = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    _canvas = FigureCanvasAgg(figure)
+
+
+def render_tile(item: SheetItem) -> np.ndarray:
+    """
+    Рисует миниатюру пиано-ролла на холсте текущего процесса.
+
+    Ноты рисуются одной коллекцией прямоугольников, без отдельных патчей.
+
+    Returns:
+        Массив RGBA размером (высота, ширина, 4)
+    """
+    figure = _canvas.figure
+    figure.clear()
+    figure.patch.set_facecolor(BACKGROUND_COLOR)
+    figure.text(
+        0.5, 0.97, item.caption(), ha="center", va="top", color="white", fontsize=9
+    )
+
+    ax = figure.add_axes((0.02, 0.03, 0.96, 0.8))
+    ax.set_facecolor(AXES_COLOR)
+    ax.set_xticks([])
+    ax.set_yticks([])
+    for spine in ax.spines.values():
+        spine.set_color("#4a4a6a")
+
+    notes = item.melody.notes
+    if notes:
+        pitches = np.array([n.pitch for n in notes], dtype=float)
+        durations = np.array([n.duration for n in notes], dtype=float)
+        ends = np.cumsum(durations)
+        starts = ends - durations
+
+        low, high = pitches.min() - 1, pitches.max() + 1
+        bottoms = pitches - 0.4
+        tops = pitches + 0.4
+        verts = np.stack(
+            [
+                np.column_stack([starts, bottoms]),
+                np.column_stack([starts, tops]),
+                np.column_stack([ends, tops]),
+                np.column_stack([ends, bottoms]),
+            ],
+            axis=1,
+        )
+        colors = plt.cm.viridis((pitches - low) / (high - low))
+        ax.add_collection(
+            PolyCollection(verts, facecolors=colors, edgecolors="white", linewidths=0.3)
+        )
+        ax.set_xlim(0, ends[-1])
+        ax.set_ylim(low - 0.5, high + 0.5)
+
+    _canvas.draw()
+    return np.asarray(_canvas.buffer_rgba()).copy()
+
+
+class _SheetWriter:
+    """Собирает миниатюры в лист и сохраняет его, когда он заполнен."""
+
+    def __init__(
+        self,
+        output_dir: Path,
+        prefix: str,
+        rows: int,
+        columns: int,
+        tile_size: Tuple[int, int],
+    ):
+        self.output_dir = output_dir
+        self.prefix = prefix
+        self.rows = rows
+        self.columns = columns
+        self.tile_width, self.tile_height = tile_size
+        self.paths: List[Path] = []
+        self._sheet: Optional[np.ndarray] = None
+        self._count = 0
+
+    def add(self, tile: np.ndarray) -> None:
+        per_sheet = self.rows * self.columns
+        position = self._count % per_sheet
+        if position == 0:
+            self._sheet = np.empty(
+                (self.rows * self.tile_height, self.columns * self.tile_width, 4),
+                dtype=np.uint8,
+            )
+            self._sheet[:] = np.array(to_rgba(BACKGROUND_COLOR)) * 255
+
+        row, column = divmod(position, self.columns)
+        y = row * self.tile_height
+        x = column * self.tile_width
+        height, width = tile.shape[:2]
+        self._sheet[y : y + height, x : x + width] = tile
+        self._count += 1
+
+        if self._count % per_sheet == 0:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._sheet is None:
+            return
+        path = self.output_dir / f"{self.prefix}_{len(self.paths) + 1:04d}.png"
+        Image.fromarray(self._sheet, "RGBA").save(path)
+        self.paths.append(path)
+        self._sheet = None
+
+
+def render_contact_sheets(
+    items: Iterable[SheetItem],
+    output_dir: Union[str, Path],
+    rows: int = 4,
+    columns: int = 4,
+    tile_size: Tuple[int, int] = (400, 200),
+    dpi: int = 100,
+    workers: Optional[int] = None,
+    max_pending: Optional[int] = None,
+    prefix: str = "sheet",
+) -> List[Path]:
+    """
+    Рисует мелодии в контактные листы размером rows x columns миниатюр.
+
+    Элементы читаются из items лениво: в работе одновременно находится не
+    больше max_pending миниатюр, поэтому items может быть генератором
+    произвольной длины. Порядок миниатюр на листах совпадает с порядком items.
+
+    Args:
+        items: Мелодии с подписями
+        output_dir: Каталог для PNG файлов листов
+        rows: Количество строк сетки
+        columns: Количество столбцов сетки
+        tile_size: Размер миниатюры в пикселях (ширина, высота)
+        dpi: Разрешение миниатюр
+        workers: Количество процессов (по умолчанию — число ядер)
+        max_pending: Предел миниатюр в работе (по умолчанию 2 * workers)
+        prefix: Префикс имён файлов листов
+
+    Returns:
+        Пути к сохранённым листам
+    """
+    if rows < 1 or columns < 1:
+        raise ValueError(f"Некорректный размер сетки: {rows}x{columns}")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    writer = _SheetWriter(output_dir, prefix, rows, columns, tile_size)
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(tile_size, dpi)
+    ) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(render_tile, item))
+            if len(pending) >= max_pending:
+                writer.add(pending.popleft().result())
+        while pending:
+            writer.add(pending.popleft().result())
+
+    writer.flush()
+    return writer.paths
@@ -0,0 +1,221 @@
+"""
+Индекс похожих мелодий для отсева дубликатов при пакетной генерации.
+
+Мелодия описывается последовательностью токенов (интервал, длительность),
+которая не меняется при транспонировании. Точные дубликаты находятся по
+хешу всей последовательности, близкие — по MinHash-сигнатурам n-грамм
+токенов, разложенным по LSH-корзинам. Вставка и запрос не зависят от
+размера индекса.
+"""
+
+import hashlib
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+from ..entities.melody import Melody
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_HASH_MASK = (1 << 61) - 1
+
+Token = Tuple[Optional[int], float]
+
+
+def melody_tokens(melody: Melody) -> List[Token]:
+    """
+    Преобразует мелодию в транспозиционно-инвариантную последовательность.
+
+    Первая нота даёт токен (None, длительность), каждая следующая —
+    (интервал от предыдущей ноты в полутонах, длительность).
+
+    Args:
+        melody: Мелодия
+
+    Returns:
+        Список токенов
+    """
+    tokens: List[Token] = []
+    prev_pitch = None
+    for note in melody.notes:
+        interval = None if prev_pitch is None else note.pitch - prev_pitch
+        tokens.append((interval, round(note.duration, 6)))
+        prev_pitch = note.pitch
+    return tokens
+
+
+def _stable_hash(shingle: Tuple[Token, ...]) -> int:
+    """
+    Хеш n-граммы, одинаковый во всех процессах. Встроенный hash() не
+    подходит: до Python 3.12 hash(None) зависит от адреса объекта.
+    """
+    digest = hashlib.blake2b(repr(shingle).encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "little") & _HASH_MASK
+
+
+def melody_shingles(melody: Melody, ngram: int = 3) -> Set[Tuple[Token, ...]]:
+    """
+    Возвращает множество n-грамм токенов мелодии.
+
+    Если нот меньше, чем ngram, вся последовательность считается одной
+    n-граммой.
+
+    Args:
+        melody: Мелодия
+        ngram: Длина n-граммы
+
+    Returns:
+        Множество n-грамм
+    """
+    tokens = melody_tokens(melody)
+    if len(tokens) <= ngram:
+        return {tuple(tokens)}
+    return {tuple(tokens[i : i + ngram]) for i in range(len(tokens) - ngram + 1)}
+
+
+class MelodyIndex:
+    """
+    Потоковый индекс мелодий с поиском точных и близких дубликатов.
+
+    Близость оценивается как доля совпавших компонент MinHash-сигнатур
+    (оценка коэффициента Жаккара по n-граммам). Кандидаты отбираются через
+    LSH: сигнатура делится на bands полос, мелодии с совпавшей полосой
+    попадают в одну корзину.
+    """
+
+    def __init__(
+        self,
+        ngram: int = 3,
+        num_perm: int = 32,
+        bands: int = 8,
+        threshold: float = 0.8,
+        seed: int = 0,
+    ):
+        """
+        Инициализация индекса.
+
+        Args:
+            ngram: Длина n-граммы токенов
+            num_perm: Количество хеш-функций MinHash
+            bands: Количество LSH-полос (должно делить num_perm)
+            threshold: Порог похожести (0-1), начиная с которого мелодия
+                считается дубликатом
+
+        Raises:
+            ValueError: Если параметры некорректны
+        """
+        if ngram < 1:
+            raise ValueError(f"Длина n-граммы должна быть положительной: {ngram}")
+        if bands < 1 or num_perm % bands != 0:
+            raise ValueError(
+                f"Количество полос ({bands}) должно делить num_perm ({num_perm})"
+            )
+        if not 0.0 <= threshold <= 1.0:
+            raise ValueError(f"Порог должен быть в диапазоне 0-1: {threshold}")
+
+        self.ngram = ngram
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self._rows = num_perm // bands
+
+        rng = random.Random(seed)
+        self._perms = [
+            (rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+        self._exact: Dict[Tuple[Token, ...], int] = {}
+        self._buckets: List[Dict[Tuple[int, ...], List[int]]] = [
+            defaultdict(list) for _ in range(bands)
+        ]
+        self._signatures: List[Tuple[int, ...]] = []
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, melody: Melody) -> bool:
+        return self.query(melody) is not None
+
+    def signature(self, melody: Melody) -> Tuple[int, ...]:
+        """
+        Вычисляет MinHash-сигнатуру мелодии.
+        """
+        hashes = [_stable_hash(s) for s in melody_shingles(melody, self.ngram)]
+        return tuple(
+            min((a * h + b) % _MERSENNE_PRIME for h in hashes) for a, b in self._perms
+        )
+
+    def similarity(self, first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+        """
+        Оценивает похожесть двух сигнатур (доля совпавших компонент).
+        """
+        same = sum(1 for x, y in zip(first, second) if x == y)
+        return same / self.num_perm
+
+    def _bands_of(self, signature: Tuple[int, ...]):
+        rows = self._rows
+        for band in range(self.bands):
+            yield band, signature[band * rows : (band + 1) * rows]
+
+    def _query(
+        self, key: Tuple[Token, ...], signature: Tuple[int, ...]
+    ) -> Optional[int]:
+        if key in self._exact:
+            return self._exact[key]
+
+        seen = set()
+        for band, part in self._bands_of(signature):
+            for candidate in self._buckets[band].get(part, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                other = self._signatures[candidate]
+                if self.similarity(signature, other) >= self.threshold:
+                    return candidate
+        return None
+
+    def _insert(self, key: Tuple[Token, ...], signature: Tuple[int, ...]) -> int:
+        melody_id = len(self._signatures)
+        self._signatures.append(signature)
+        self._exact.setdefault(key, melody_id)
+        for band, part in self._bands_of(signature):
+            self._buckets[band][part].append(melody_id)
+        return melody_id
+
+    def query(self, melody: Melody) -> Optional[int]:
+        """
+        Ищет в индексе дубликат мелодии (с точностью до транспонирования).
+
+        Args:
+            melody: Проверяемая мелодия
+
+        Returns:
+            Идентификатор найденной похожей мелодии или None
+        """
+        return self._query(tuple(melody_tokens(melody)), self.signature(melody))
+
+    def insert(self, melody: Melody) -> int:
+        """
+        Добавляет мелодию в индекс без проверки на дубликаты.
+
+        Returns:
+            Идентификатор мелодии в индексе
+        """
+        return self._insert(tuple(melody_tokens(melody)), self.signature(melody))
+
+    def add_if_unique(self, melody: Melody) -> bool:
+        """
+        Добавляет мелодию, если в индексе нет похожей.
+
+        Args:
+            melody: Мелодия
+
+        Returns:
+            True если мелодия добавлена, False если это дубликат
+        """
+        key = tuple(melody_tokens(melody))
+        signature = self.signature(melody)
+        if self._query(key, signature) is not None:
+            return False
+        self._insert(key, signature)
+        return True
@@ -0,0 +1,207 @@
+"""
+Покомпонентное редактирование мелодии: перегенерация, закрепление и
+транспонирование отдельных нот или диапазонов.
+
+Редактор хранит начала нот (префиксные суммы длительностей) и закодированные
+MIDI события каждой ноты, поэтому правка пересчитывает только затронутые
+ноты, а не всю мелодию.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from itertools import accumulate
+from pathlib import Path
+from typing import List, Set, Tuple, Union
+
+from ..entities.melody import MIDI_MAX_PITCH, MIDI_MIN_PITCH, Melody
+from ..entities.note import Note
+from .exporter import build_midi_bytes, encode_note
+from .generator import MelodyGenerator
+
+
+@dataclass
+class EditResult:
+    """
+    Результат правки.
+
+    Attributes:
+        start: Индекс первой изменённой ноты
+        stop: Индекс после последней изменённой ноты
+        shifted: True если изменились длительности и, значит, сдвинулись
+            начала всех нот после stop
+    """
+
+    start: int
+    stop: int
+    shifted: bool = False
+
+
+class MelodyEditor:
+    """Редактор мелодии с инкрементальным обновлением MIDI представления."""
+
+    def __init__(
+        self,
+        melody: Melody,
+        generator: MelodyGenerator,
+        tempo: int = 120,
+        velocity: int = 64,
+        ticks_per_beat: int = 480,
+    ):
+        """
+        Инициализация редактора.
+
+        Args:
+            melody: Редактируемая мелодия (изменяется на месте)
+            generator: Генератор, из которого берутся новые ноты
+            tempo: Темп в BPM для MIDI экспорта
+            velocity: Громкость нот (0-127)
+            ticks_per_beat: Разрешение MIDI файла
+        """
+        self.melody = melody
+        self.generator = generator
+        self.tempo = tempo
+        self.velocity = velocity
+        self.ticks_per_beat = ticks_per_beat
+        self.locked: Set[int] = set()
+
+        self.onsets: List[float] = []
+        self._update_onsets(0)
+
+        self._chunks = [self._encode(n) for n in melody.notes]
+        self._size = sum(len(c) for c in self._chunks)
+
+    def __len__(self) -> int:
+        return len(self.melody.notes)
+
+    def _encode(self, note: Note) -> bytes:
+        return encode_note(note, self.velocity, self.ticks_per_beat)
+
+    def _update_onsets(self, start: int) -> None:
+        """Пересчитывает начала нот, начиная с индекса start."""
+        notes = self.melody.notes
+        base = self.onsets[start] if start else 0.0
+        del self.onsets[start:]
+        self.onsets.extend(
+            accumulate((n.duration for n in notes[start:]), initial=base)
+        )
+
+    def _span(self, start: int, stop: int) -> Tuple[int, int]:
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            raise ValueError(f"Пустой диапазон нот: {start}-{stop}")
+        return start, stop
+
+    def note_at(self, time: float) -> int:
+        """
+        Возвращает индекс ноты, звучащей в момент time (в долях).
+        """
+        index = bisect_right(self.onsets, time) - 1
+        return min(max(index, 0), len(self) - 1)
+
+    def is_locked(self, index: int) -> bool:
+        """Проверяет, закреплена ли нота."""
+        return index in self.locked
+
+    def lock(self, start: int, stop: int) -> None:
+        """
+        Закрепляет ноты диапазона [start, stop): правки их не меняют.
+        """
+        start, stop = self._span(start, stop)
+        self.locked.update(range(start, stop))
+
+    def unlock(self, start: int, stop: int) -> None:
+        """Снимает закрепление с нот диапазона [start, stop)."""
+        start, stop = self._span(start, stop)
+        self.locked.difference_update(range(start, stop))
+
+    def set_note(self, index: int, note: Note) -> EditResult:
+        """
+        Заменяет одну ноту (закрепление не учитывается).
+        """
+        start, stop = self._span(index, index + 1)
+        old = self.melody.notes[start]
+        return self._apply(start, stop, [note], old.duration != note.duration)
+
+    def transpose(self, start: int, stop: int, semitones: int) -> EditResult:
+        """
+        Транспонирует незакреплённые ноты диапазона [start, stop).
+
+        Высота ограничивается диапазоном MIDI (0-127).
+
+        Args:
+            start: Индекс первой ноты
+            stop: Индекс после последней ноты
+            semitones: Сдвиг в полутонах (отрицательный — вниз)
+        """
+        start, stop = self._span(start, stop)
+        notes = [
+            (
+                n
+                if i in self.locked
+                else Note(
+                    pitch=min(max(n.pitch + semitones, MIDI_MIN_PITCH), MIDI_MAX_PITCH),
+                    duration=n.duration,
+                )
+            )
+            for i, n in enumerate(self.melody.notes[start:stop], start)
+        ]
+        return self._apply(start, stop, notes, False)
+
+    def regenerate(
+        self, start: int, stop: int, keep_durations: bool = True
+    ) -> EditResult:
+        """
+        Заново генерирует незакреплённые ноты диапазона [start, stop).
+
+        Args:
+            start: Индекс первой ноты
+            stop: Индекс после последней ноты
+            keep_durations: Если True, меняются только высоты и ритм
+                остальной мелодии не сдвигается
+        """
+        start, stop = self._span(start, stop)
+        notes = []
+        shifted = False
+        for i, old in enumerate(self.melody.notes[start:stop], start):
+            if i in self.locked:
+                notes.append(old)
+                continue
+            note = self.generator.random_note()
+            if keep_durations:
+                note.duration = old.duration
+            shifted = shifted or note.duration != old.duration
+            notes.append(note)
+        return self._apply(start, stop, notes, shifted)
+
+    def _apply(
+        self, start: int, stop: int, notes: List[Note], shifted: bool
+    ) -> EditResult:
+        for i, note in enumerate(notes, start):
+            self.melody.notes[i] = note
+            chunk = self._encode(note)
+            self._size += len(chunk) - len(self._chunks[i])
+            self._chunks[i] = chunk
+        # Список нот изменён на месте: кэш массивов мелодии устарел
+        self.melody.invalidate()
+        if shifted:
+            self._update_onsets(start)
+        return EditResult(start, stop, shifted)
+
+    def midi_bytes(self) -> bytes:
+        """
+        Возвращает содержимое MIDI файла текущей мелодии.
+        """
+        return build_midi_bytes(
+            self._chunks, self._size, self.tempo, self.ticks_per_beat
+        )
+
+    def save_midi(self, output_path: Union[str, Path]) -> Path:
+        """
+        Сохраняет текущую мелодию в MIDI файл.
+
+        Returns:
+            Путь к созданному файлу
+        """
+        output_path = Path(output_path)
+        output_path.write_bytes(self.midi_bytes())
+        return output_path
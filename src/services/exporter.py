@@ -2,13 +2,23 @@
 Экспорт мелодий в формат MIDI.
 """
 
+import heapq
+import struct
 from pathlib import Path
-from typing import Union
+from typing import Iterable, Iterator, List, Tuple, Union
 
 import mido
 from mido import Message, MidiFile, MidiTrack
+from mido.midifiles.midifiles import encode_variable_int
 
+from ..entities.arrangement import Arrangement, Voice
 from ..entities.melody import Melody
+from ..entities.note import Note
+
+# Событие голоса: (абсолютное время в тиках, порядок, тип, нота, громкость, канал).
+# При равном времени note_off (порядок 0) идёт раньше note_on (порядок 1),
+# чтобы повторённая нота не обрывалась.
+VoiceEvent = Tuple[int, int, str, int, int, int]
 
 
 def export_to_midi(
@@ -54,3 +64,154 @@ def export_to_midi(
 
     mid.save(output_path)
     return output_path
+
+
+def encode_note(note: Note, velocity: int = 64, ticks_per_beat: int = 480) -> bytes:
+    """
+    Кодирует ноту в байты дорожки MIDI: note_on и note_off с дельта-временем.
+
+    Результат совпадает с тем, что записывает export_to_midi для этой ноты,
+    и не зависит от соседних нот, поэтому при изменении одной ноты можно
+    перекодировать только её.
+
+    Args:
+        note: Нота
+        velocity: Громкость (0-127)
+        ticks_per_beat: Разрешение MIDI файла
+    """
+    duration_ticks = int(note.duration * ticks_per_beat)
+    return (
+        bytes((0, 0x90, note.pitch, velocity))
+        + bytes(encode_variable_int(duration_ticks))
+        + bytes((0x80, note.pitch, 0))
+    )
+
+
+def build_midi_bytes(
+    note_chunks: Iterable[bytes],
+    size: int,
+    tempo: int = 120,
+    ticks_per_beat: int = 480,
+) -> bytes:
+    """
+    Собирает MIDI файл из заранее закодированных нот (см. encode_note).
+
+    Args:
+        note_chunks: Закодированные ноты по порядку
+        size: Суммарная длина note_chunks в байтах
+        tempo: Темп в BPM (ударов в минуту)
+        ticks_per_beat: Разрешение MIDI файла
+
+    Returns:
+        Содержимое MIDI файла, совпадающее с результатом export_to_midi
+    """
+    microseconds_per_beat = int(60_000_000 / tempo)
+    prelude = (
+        b"\x00"
+        + bytes(mido.MetaMessage("set_tempo", tempo=microseconds_per_beat).bytes())
+        + b"\x00"
+        + bytes(Message("program_change", program=0).bytes())
+    )
+    end = b"\x00" + bytes(mido.MetaMessage("end_of_track").bytes())
+
+    header = b"MThd" + struct.pack(">Ihhh", 6, 1, 1, ticks_per_beat)
+    track_size = len(prelude) + size + len(end)
+    return b"".join(
+        [header, b"MTrk", struct.pack(">I", track_size), prelude, *note_chunks, end]
+    )
+
+
+def voice_events(voice: Voice, ticks_per_beat: int = 480) -> Iterator[VoiceEvent]:
+    """
+    Возвращает события голоса в абсолютном времени, упорядоченные по времени.
+
+    Время накапливается в долях и округляется до тиков только в конце,
+    поэтому ошибка округления не накапливается на длинных голосах.
+
+    Args:
+        voice: Голос аранжировки
+        ticks_per_beat: Разрешение MIDI файла
+    """
+    beats = 0.0
+    for note in voice.melody.notes:
+        start = round(beats * ticks_per_beat)
+        beats += note.duration
+        end = round(beats * ticks_per_beat)
+        yield start, 1, "note_on", note.pitch, voice.velocity, voice.channel
+        yield end, 0, "note_off", note.pitch, 0, voice.channel
+
+
+def merge_voice_events(
+    voices: List[Voice], ticks_per_beat: int = 480
+) -> Iterator[VoiceEvent]:
+    """
+    Сливает события всех голосов в один упорядоченный по времени поток.
+
+    Используется k-путевое слияние на куче: для N событий и k голосов
+    время работы O(N log k), в памяти одновременно хранится по одному
+    событию на голос.
+
+    Args:
+        voices: Голоса аранжировки
+        ticks_per_beat: Разрешение MIDI файла
+    """
+    streams = [voice_events(v, ticks_per_beat) for v in voices]
+    return heapq.merge(*streams, key=lambda e: (e[0], e[1]))
+
+
+def export_arrangement_to_midi(
+    arrangement: Arrangement,
+    output_path: Union[str, Path],
+    tempo: int = 120,
+    ticks_per_beat: int = 480,
+) -> Path:
+    """
+    Экспортирует многоголосную аранжировку в MIDI файл с одной дорожкой.
+
+    Голоса различаются MIDI каналами, ноты разных голосов могут звучать
+    одновременно.
+
+    Args:
+        arrangement: Аранжировка для экспорта
+        output_path: Путь к выходному файлу
+        tempo: Темп в BPM (ударов в минуту)
+        ticks_per_beat: Разрешение MIDI файла
+
+    Returns:
+        Путь к созданному файлу
+    """
+    output_path = Path(output_path)
+
+    mid = MidiFile(ticks_per_beat=ticks_per_beat)
+    track = MidiTrack()
+    mid.tracks.append(track)
+
+    microseconds_per_beat = int(60_000_000 / tempo)
+    track.append(mido.MetaMessage("set_tempo", tempo=microseconds_per_beat))
+
+    programs = {}
+    for voice in arrangement.voices:
+        programs.setdefault(voice.channel, voice.program)
+    for channel, program in sorted(programs.items()):
+        track.append(
+            Message("program_change", channel=channel, program=program, time=0)
+        )
+
+    last_tick = 0
+    events = merge_voice_events(arrangement.voices, ticks_per_beat)
+    for tick, _, kind, pitch, velocity, channel in events:
+        track.append(
+            Message(
+                kind,
+                channel=channel,
+                note=pitch,
+                velocity=velocity,
+                time=tick - last_tick,
+            )
+        )
+        last_tick = tick
+
+    track.append(mido.MetaMessage("end_of_track", time=0))
+
+    mid.save(output_path)
+    return output_path
@@ -3,46 +3,179 @@
 """
 
 import random
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from ..entities.melody import Melody
 from ..entities.note import Note
 from ..entities.scale import Scale
 from ..entities.settings import GeneratorSettings
+from .dedup import MelodyIndex
+from .sampling import AliasTable, weights_for
 
 
 class MelodyGenerator:
     """Класс для генерации мелодий на основе гаммы и настроек."""
 
-    def __init__(self, scale: Scale, settings: GeneratorSettings):
+    def __init__(
+        self, scale: Scale, settings: GeneratorSettings, seed: Optional[int] = None
+    ):
         """
         Инициализация генератора.
 
         Args:
             scale: Музыкальная гамма
             settings: Настройки генерации
+            seed: Зерно генератора случайных чисел для воспроизводимости;
+                если не указано, используется общий генератор модуля random
         """
         self.scale = scale
         self.settings = settings
+        self.seed = seed
+        self.rng = random.Random(seed) if seed is not None else random
+        self._np_rng: Optional[np.random.Generator] = None
+
+        # Таблицы псевдонимов строятся один раз; без весов выбор остаётся
+        # равновероятным через rng.choice/randint, как и раньше
+        self._octaves = list(range(-settings.octave_range, settings.octave_range + 1))
+        self._degree_table = self._compile(
+            range(len(scale.intervals)), settings.degree_weights
+        )
+        self._octave_table = self._compile(self._octaves, settings.octave_weights)
+        self._duration_table = self._compile(
+            settings.allowed_durations, settings.duration_weights
+        )
+
+    @staticmethod
+    def _compile(
+        values: Sequence, weights: Optional[Dict[float, float]]
+    ) -> Optional[AliasTable]:
+        if weights is None:
+            return None
+        return AliasTable(weights_for(list(values), weights))
 
     def generate(self) -> Melody:
         """
         Генерирует новую мелодию.
         """
-        notes = []
+        notes = [self.random_note() for _ in range(self.settings.length)]
+        return Melody(notes)
 
-        for _ in range(self.settings.length):
-            pitch = self._random_pitch()
-            duration = random.choice(self.settings.allowed_durations)
-            notes.append(Note(pitch=pitch, duration=duration))
+    def random_note(self) -> Note:
+        """
+        Возвращает случайную ноту гаммы со случайной допустимой длительностью.
+        """
+        pitch = self._random_pitch()
+        durations = self.settings.allowed_durations
+        if self._duration_table is None:
+            duration = self.rng.choice(durations)
+        else:
+            duration = durations[self._duration_table.sample(self.rng)]
+        return Note(pitch=pitch, duration=duration)
 
-        return Melody(notes)
+    def sample_arrays(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Векторно генерирует высоты и длительности count мелодий.
+
+        Использует те же распределения (включая веса), что и generate(),
+        но генератор numpy, поэтому последовательность отличается.
+
+        Args:
+            count: Количество мелодий
+
+        Returns:
+            Массивы высот и длительностей формы (count, settings.length)
+        """
+        if self._np_rng is None:
+            self._np_rng = np.random.default_rng(self.seed)
+        shape = (count, self.settings.length)
+
+        intervals = np.asarray(self.scale.intervals)
+        octaves = np.asarray(self._octaves)
+        durations = np.asarray(self.settings.allowed_durations, dtype=float)
+
+        degree = self._sample_indices(self._degree_table, len(intervals), shape)
+        octave = self._sample_indices(self._octave_table, len(octaves), shape)
+        duration = self._sample_indices(self._duration_table, len(durations), shape)
+
+        pitches = self.scale.root + intervals[degree] + 12 * octaves[octave]
+        return pitches, durations[duration]
+
+    def _sample_indices(
+        self, table: Optional[AliasTable], size: int, shape: Tuple[int, int]
+    ) -> np.ndarray:
+        if table is None:
+            return self._np_rng.integers(0, size, size=shape)
+        return table.sample_array(shape, self._np_rng)
+
+    def generate_many(self, count: int) -> List[Melody]:
+        """
+        Генерирует count мелодий векторным путём (см. sample_arrays).
+        """
+        pitches, durations = self.sample_arrays(count)
+        return [
+            Melody(
+                [
+                    Note(pitch=p, duration=d)
+                    for p, d in zip(row_p.tolist(), row_d.tolist())
+                ]
+            )
+            for row_p, row_d in zip(pitches, durations)
+        ]
+
+    def generate_batch(
+        self,
+        count: int,
+        index: Optional[MelodyIndex] = None,
+        max_attempts: int = 10,
+    ) -> List[Melody]:
+        """
+        Генерирует пакет мелодий без повторов и транспозиций друг друга.
+
+        Каждая мелодия проверяется по индексу похожих мелодий; дубликат
+        перегенерируется, но не более max_attempts раз. Если уникальную
+        мелодию получить не удалось (например, при очень коротких мелодиях),
+        пакет будет меньше count.
+
+        Args:
+            count: Желаемое количество мелодий
+            index: Индекс для проверки; по умолчанию создаётся новый.
+                Передача общего индекса позволяет отсеивать повторы между
+                несколькими пакетами.
+            max_attempts: Число попыток на одну мелодию
+
+        Returns:
+            Список уникальных мелодий
+        """
+        if index is None:
+            index = MelodyIndex()
+
+        melodies = []
+        for _ in range(count):
+            for _ in range(max_attempts):
+                melody = self.generate()
+                if index.add_if_unique(melody):
+                    melodies.append(melody)
+                    break
+
+        return melodies
 
     def _random_pitch(self) -> int:
         """
         Возвращает MIDI номер случайной ноты в рамках гаммы.
         """
-        interval = random.choice(self.scale.intervals)
-        octave_shift = random.randint(
-            -self.settings.octave_range, self.settings.octave_range
-        )
+        intervals = self.scale.intervals
+        if self._degree_table is None:
+            interval = self.rng.choice(intervals)
+        else:
+            interval = intervals[self._degree_table.sample(self.rng)]
+
+        if self._octave_table is None:
+            octave_shift = self.rng.randint(
+                -self.settings.octave_range, self.settings.octave_range
+            )
+        else:
+            octave_shift = self._octaves[self._octave_table.sample(self.rng)]
+
         return self.scale.root + interval + 12 * octave_shift
@@ -0,0 +1,345 @@
+"""
+Определение тональности и гаммы мелодии по 12-битным маскам
+звуковысотных классов.
+
+Маски всех гамм от всех 12 корней собраны в один массив, поэтому проверка
+и ранжирование сводятся к побитовым операциям над массивами numpy —
+как для одной мелодии, так и для целого корпуса.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..entities.melody import Melody
+from ..entities.scale import (
+    FULL_MASK,
+    PITCH_CLASS_KEYS,
+    SCALE_MASKS,
+    Scale,
+    ScaleType,
+)
+
+# Порядок гамм в массивах: (корень как звуковысотный класс, тип гаммы)
+SCALE_INDEX: List[Tuple[int, ScaleType]] = list(SCALE_MASKS)
+
+_MASKS = np.array([SCALE_MASKS[entry] for entry in SCALE_INDEX], dtype=np.uint16)
+_ROOTS = np.array([root for root, _ in SCALE_INDEX], dtype=np.uint16)
+
+# Количество единичных битов для каждой 12-битной маски
+_POPCOUNT = np.array([bin(m).count("1") for m in range(FULL_MASK + 1)], dtype=np.uint8)
+
+# Принадлежность звуковысотных классов гаммам, форма (число гамм, 12)
+_MEMBERSHIP = (_MASKS[:, None] >> np.arange(12, dtype=np.uint16)) & 1
+
+_SIZES = _POPCOUNT[_MASKS].astype(np.int64)
+
+
+@dataclass
+class ScaleMatch:
+    """
+    Гамма, подходящая мелодии.
+
+    Attributes:
+        key: Тональность (название корня)
+        scale_type: Тип гаммы
+        mask: Маска звуковысотных классов гаммы
+        outside: Количество звуковысотных классов мелодии вне гаммы
+        coverage: Доля длительности мелодии, приходящаяся на ноты гаммы
+    """
+
+    key: str
+    scale_type: ScaleType
+    mask: int
+    outside: int
+    coverage: float
+
+    @property
+    def fits(self) -> bool:
+        """True, если все ноты мелодии принадлежат гамме."""
+        return self.outside == 0
+
+    def to_scale(self) -> Scale:
+        """Возвращает гамму от корня в четвёртой октаве."""
+        return Scale.from_key(self.key, self.scale_type)
+
+
+def _class_bits(pitches: np.ndarray) -> np.ndarray:
+    """Бит звуковысотного класса каждой ноты (uint16)."""
+    classes = (np.asarray(pitches) % 12).astype(np.uint16)
+    return np.left_shift(np.uint16(1), classes)
+
+
+def melody_mask(melody: Melody) -> int:
+    """Возвращает маску звуковысотных классов мелодии."""
+    return int(np.bitwise_or.reduce(_class_bits(melody.pitches), initial=0))
+
+
+def masks_from_arrays(pitches: np.ndarray) -> np.ndarray:
+    """
+    Возвращает маски мелодий одной длины, заданных двумерным массивом
+    высот (например, результатом MelodyGenerator.sample_arrays).
+
+    Args:
+        pitches: Высоты нот, форма (количество мелодий, длина)
+
+    Returns:
+        Маски uint16, форма (количество мелодий,)
+
+    Raises:
+        ValueError: Если массив не двумерный
+    """
+    pitches = np.asarray(pitches)
+    if pitches.ndim != 2:
+        raise ValueError(f"Ожидается двумерный массив высот: {pitches.shape}")
+    return np.bitwise_or.reduce(_class_bits(pitches), axis=1, initial=0)
+
+
+def masks_from_ragged(pitches: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Возвращает маски мелодий разной длины, высоты которых склеены в один
+    массив.
+
+    Args:
+        pitches: Высоты нот всех мелодий подряд
+        lengths: Количество нот каждой мелодии
+
+    Returns:
+        Маски uint16, форма (len(lengths),); у пустых мелодий маска 0
+
+    Raises:
+        ValueError: Если сумма длин не совпадает с числом высот
+    """
+    pitches = np.asarray(pitches)
+    lengths = np.asarray(lengths, dtype=np.int64)
+    if lengths.sum() != len(pitches):
+        raise ValueError(
+            f"Сумма длин ({lengths.sum()}) не совпадает с числом высот "
+            f"({len(pitches)})"
+        )
+    masks = np.zeros(len(lengths), dtype=np.uint16)
+    nonempty = lengths > 0
+    if nonempty.any():
+        # Пустые мелодии пропускаются: отрезок каждой непустой мелодии
+        # тянется до начала следующей непустой
+        starts = (np.cumsum(lengths) - lengths)[nonempty]
+        masks[nonempty] = np.bitwise_or.reduceat(_class_bits(pitches), starts)
+    return masks
+
+
+def finals_from_arrays(pitches: np.ndarray) -> np.ndarray:
+    """
+    Звуковысотные классы последних нот мелодий одной длины.
+
+    Args:
+        pitches: Высоты нот, форма (количество мелодий, длина)
+
+    Returns:
+        Классы int64, форма (количество мелодий,); -1 для пустых мелодий
+    """
+    pitches = np.asarray(pitches)
+    if pitches.ndim != 2:
+        raise ValueError(f"Ожидается двумерный массив высот: {pitches.shape}")
+    if pitches.shape[1] == 0:
+        return np.full(len(pitches), -1, dtype=np.int64)
+    return pitches[:, -1].astype(np.int64) % 12
+
+
+def weights_from_arrays(pitches: np.ndarray, durations: np.ndarray) -> np.ndarray:
+    """
+    Суммарная длительность каждого звуковысотного класса в мелодиях одной
+    длины.
+
+    Args:
+        pitches: Высоты нот, форма (количество мелодий, длина)
+        durations: Длительности нот той же формы
+
+    Returns:
+        Массив формы (количество мелодий, 12)
+    """
+    pitches = np.asarray(pitches)
+    rows = np.arange(len(pitches))[:, None]
+    return _class_sums(rows * 12 + pitches % 12, durations, len(pitches))
+
+
+def _class_sums(index: np.ndarray, durations: np.ndarray, count: int) -> np.ndarray:
+    """Суммирует длительности по индексам «мелодия * 12 + класс»."""
+    flat = np.asarray(index, dtype=np.int64).ravel()
+    sums = np.bincount(
+        flat, weights=np.asarray(durations, dtype=float).ravel(), minlength=count * 12
+    )
+    return sums.reshape(count, 12)
+
+
+def _concat(melodies: Iterable[Melody]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Склеивает высоты и длительности корпуса; возвращает их и длины."""
+    melodies = list(melodies)
+    lengths = np.fromiter((len(m) for m in melodies), np.int64, len(melodies))
+    if not melodies:
+        return np.zeros(0, dtype=np.int64), np.zeros(0), lengths
+    pitches = np.concatenate([m.pitches for m in melodies])
+    durations = np.concatenate([m.durations for m in melodies])
+    return pitches, durations, lengths
+
+
+def melody_masks(melodies: Iterable[Melody]) -> np.ndarray:
+    """Возвращает маски корпуса мелодий массивом uint16."""
+    pitches, _, lengths = _concat(melodies)
+    return masks_from_ragged(pitches, lengths)
+
+
+def melody_finals(melodies: Iterable[Melody]) -> np.ndarray:
+    """
+    Звуковысотные классы последних нот корпуса мелодий (-1 для пустых).
+    """
+    pitches, _, lengths = _concat(melodies)
+    finals = np.full(len(lengths), -1, dtype=np.int64)
+    nonempty = lengths > 0
+    finals[nonempty] = pitches[(np.cumsum(lengths) - 1)[nonempty]] % 12
+    return finals
+
+
+def melody_weights(melodies: Iterable[Melody]) -> np.ndarray:
+    """
+    Суммарная длительность каждого звуковысотного класса для корпуса
+    мелодий, форма (количество мелодий, 12).
+    """
+    pitches, durations, lengths = _concat(melodies)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    return _class_sums(rows * 12 + pitches % 12, durations, len(lengths))
+
+
+def pitch_class_weights(melody: Melody) -> np.ndarray:
+    """Суммарная длительность нот каждого из 12 звуковысотных классов."""
+    return np.bincount(melody.pitches % 12, weights=melody.durations, minlength=12)
+
+
+def outside_counts(masks: np.ndarray) -> np.ndarray:
+    """
+    Считает звуковысотные классы мелодий вне каждой гаммы.
+
+    Args:
+        masks: Маски мелодий, форма (n,)
+
+    Returns:
+        Массив формы (n, число гамм) в порядке SCALE_INDEX
+    """
+    masks = np.asarray(masks, dtype=np.uint16)
+    return _POPCOUNT[masks[:, None] & ~_MASKS[None, :] & FULL_MASK]
+
+
+def fit_matrix(masks: np.ndarray) -> np.ndarray:
+    """
+    Для каждой мелодии корпуса отмечает гаммы, которые её целиком содержат.
+
+    Returns:
+        Булев массив формы (n, число гамм) в порядке SCALE_INDEX
+    """
+    masks = np.asarray(masks, dtype=np.uint16)
+    return (masks[:, None] & ~_MASKS[None, :] & FULL_MASK) == 0
+
+
+def best_fit(
+    masks: np.ndarray,
+    finals: Optional[np.ndarray] = None,
+    weights: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Выбирает лучшую гамму для каждой мелодии корпуса.
+
+    Порядок выбора:
+    1. меньше звуковысотных классов вне гаммы;
+    2. меньше размер гаммы (более узкая гамма точнее);
+    3. корень гаммы совпадает с последней нотой мелодии (если заданы finals);
+    4. больше длительность корня гаммы в мелодии (если заданы weights,
+       иначе — корень вообще встречается в мелодии);
+    5. порядок ScaleType (более употребительные гаммы раньше).
+
+    Лады с одним набором звуков различаются только шагами 3-4, поэтому без
+    finals и weights выбор между ними случаен с музыкальной точки зрения.
+    rank_scales использует те же правила.
+
+    Args:
+        masks: Маски мелодий, форма (n,)
+        finals: Классы последних нот (melody_finals, finals_from_arrays)
+        weights: Длительности классов, форма (n, 12) (melody_weights,
+            weights_from_arrays)
+
+    Returns:
+        Индексы в SCALE_INDEX, форма (n,)
+    """
+    masks = np.asarray(masks, dtype=np.uint16)
+    outside = outside_counts(masks).astype(np.int64)
+    score = (outside * 13 + _SIZES[None, :]) * 2
+    if finals is not None:
+        finals = np.asarray(finals, dtype=np.int64)
+        score = score + (_ROOTS[None, :] != finals[:, None])
+    if weights is None:
+        root_share = (masks[:, None] >> _ROOTS[None, :]) & 1
+    else:
+        weights = np.asarray(weights, dtype=float)
+        total = weights.sum(axis=1, keepdims=True)
+        root_share = weights[:, _ROOTS] / np.where(total > 0, total, 1.0)
+    # Доля корня от 0 до 1 решает только при равенстве целочисленной части
+    return np.argmin(score * 2 - root_share, axis=1)
+
+
+def rank_scales(melody: Melody, top: Optional[int] = None) -> List[ScaleMatch]:
+    """
+    Ранжирует все гаммы по соответствию мелодии.
+
+    Порядок: доля длительности в гамме (по убыванию), затем правила
+    best_fit: число классов вне гаммы, размер гаммы, совпадение корня с
+    последней нотой, длительность корня в мелодии, порядок ScaleType.
+    Для мелодии без нот вне гаммы результат совпадает с best_fit.
+
+    Args:
+        melody: Мелодия
+        top: Сколько лучших гамм вернуть (по умолчанию — все)
+
+    Returns:
+        Список совпадений, лучшие первыми
+
+    Raises:
+        ValueError: Если мелодия пуста
+    """
+    if len(melody) == 0:
+        raise ValueError("Нельзя определить тональность пустой мелодии")
+
+    weights = pitch_class_weights(melody)
+    total = weights.sum()
+    coverage = _MEMBERSHIP @ weights / total if total > 0 else np.ones(len(_MASKS))
+    outside = outside_counts(np.array([melody_mask(melody)]))[0]
+    final_mismatch = int(melody.pitches[-1]) % 12 != _ROOTS
+    tonic = weights[_ROOTS]
+
+    # lexsort сортирует по последнему ключу в первую очередь и устойчив,
+    # поэтому при полном равенстве сохраняется порядок SCALE_INDEX
+    order = np.lexsort((-tonic, final_mismatch, _SIZES, outside, -coverage))
+    if top is not None:
+        order = order[:top]
+
+    matches = []
+    for i in order:
+        root, scale_type = SCALE_INDEX[i]
+        matches.append(
+            ScaleMatch(
+                key=PITCH_CLASS_KEYS[root],
+                scale_type=scale_type,
+                mask=int(_MASKS[i]),
+                outside=int(outside[i]),
+                coverage=float(coverage[i]),
+            )
+        )
+    return matches
+
+
+def detect_key(melody: Melody) -> ScaleMatch:
+    """
+    Определяет наиболее вероятную тональность и гамму мелодии.
+
+    Raises:
+        ValueError: Если мелодия пуста
+    """
+    return rank_scales(melody, top=1)[0]
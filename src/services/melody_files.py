@@ -0,0 +1,88 @@
+"""
+Генерация мелодии по набору параметров и запись её результатов (MIDI,
+текст, PNG). Общие шаги для перебора параметров и пакетного конвейера:
+мелодия и имена файлов зависят только от параметров.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+
+from ..entities.melody import Melody
+from ..entities.scale import Scale, ScaleType
+from ..entities.settings import GeneratorSettings
+from .exporter import export_to_midi
+from .generator import MelodyGenerator
+from .visualizer import plot_piano_roll, pretty_print_melody
+
+DEFAULT_DURATIONS = (0.25, 0.5, 1.0)
+
+
+@dataclass(frozen=True)
+class MelodySpec:
+    """
+    Параметры генерации одной мелодии.
+
+    Attributes:
+        key: Тональность
+        scale: Тип гаммы (значение ScaleType)
+        tempo: Темп в BPM
+        octave_range: Диапазон октав
+        seed: Зерно генератора
+        length: Количество нот
+        durations: Допустимые длительности
+    """
+
+    key: str
+    scale: str
+    tempo: int
+    octave_range: int
+    seed: int
+    length: int = 8
+    durations: tuple = DEFAULT_DURATIONS
+
+    @property
+    def name(self) -> str:
+        """Основа имён файлов результатов."""
+        return (
+            f"{self.key}_{self.scale}_{self.tempo}bpm"
+            f"_oct{self.octave_range}_len{self.length}_seed{self.seed}"
+        )
+
+    def stem(self, output_dir: Path) -> Path:
+        """Путь к файлам результатов без расширения."""
+        return Path(output_dir) / self.name
+
+
+def generate_melody(spec: MelodySpec) -> Melody:
+    """Генерирует мелодию по параметрам."""
+    scale = Scale.from_key(spec.key, ScaleType(spec.scale))
+    settings = GeneratorSettings(
+        length=spec.length,
+        allowed_durations=list(spec.durations),
+        octave_range=spec.octave_range,
+    )
+    return MelodyGenerator(scale, settings, seed=spec.seed).generate()
+
+
+def write_midi(melody: Melody, spec: MelodySpec, output_dir: Path) -> Path:
+    """Записывает MIDI файл и возвращает путь к нему."""
+    path = spec.stem(output_dir).with_suffix(".mid")
+    return export_to_midi(melody, path, tempo=spec.tempo)
+
+
+def write_text(melody: Melody, spec: MelodySpec, output_dir: Path) -> Path:
+    """Записывает текстовое представление мелодии и возвращает путь к нему."""
+    path = spec.stem(output_dir).with_suffix(".txt")
+    path.write_text(pretty_print_melody(melody, key=spec.key), encoding="utf-8")
+    return path
+
+
+def write_png(melody: Melody, spec: MelodySpec, output_dir: Path) -> Path:
+    """Рисует пиано-ролл в PNG и возвращает путь к нему."""
+    return plot_piano_roll(
+        melody,
+        key=spec.key,
+        scale_name=spec.scale,
+        output_path=spec.stem(output_dir).with_suffix(".png"),
+        show=False,
+    )
@@ -0,0 +1,475 @@
+"""
+Пиано-ролл на холсте Tk для встраивания в GUI.
+
+Ноты рисуются прямоугольниками холста прямо по данным мелодии — без
+растеризации через matplotlib и без временных файлов. При изменении
+размера окна элементы не пересоздаются: их координаты преобразуются
+одним вызовом Canvas.scale. Отображается только окно по времени; если
+нот в окне больше, чем помещается по ширине, они сводятся в сетку
+«высота × столбец», цвет ячейки которой показывает долю времени
+звучания.
+"""
+
+import math
+from tkinter import Canvas
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.colors import to_hex
+
+from ..entities.melody import Melody
+from .visualizer import midi_to_name, should_use_flats
+
+BACKGROUND_COLOR = "#16213e"
+AXES_COLOR = "#1a1a2e"
+GRID_COLOR = "#2a2a4a"
+SPINE_COLOR = "#4a4a6a"
+TEXT_COLOR = "white"
+
+# Маска клавиши Ctrl в event.state
+CONTROL_MASK = 0x0004
+
+
+class PianoRollCanvas(Canvas):
+    """
+    Виртуализированный пиано-ролл на холсте Tk.
+
+    Все элементы области нот и сетки помечены тегом «roll», подписи высот —
+    «ylabel», подписи времени — «xlabel». Поле слева и сверху фиксировано,
+    поэтому при изменении размера область нот масштабируется относительно
+    своего левого верхнего угла.
+    """
+
+    MARGIN_LEFT = 48
+    MARGIN_TOP = 28
+    MARGIN_RIGHT = 10
+    MARGIN_BOTTOM = 22
+    # Средняя ширина ноты в пикселях, ниже которой ноты сводятся в сетку
+    MIN_NOTE_PIXELS = 4
+    # Ширина столбца сетки плотности в пикселях
+    DENSITY_COLUMN_PIXELS = 2
+    # Число уровней цвета для доли времени звучания; соседние ячейки
+    # одного уровня объединяются в один прямоугольник
+    DENSITY_LEVELS = 8
+    # Предел нот для сетки плотности; сверх него ноты берутся с шагом
+    MAX_BINNED_NOTES = 200_000
+    # Минимальное расстояние между линиями сетки долей в пикселях
+    MIN_GRID_PIXELS = 40
+    # Минимальная ширина окна в долях
+    MIN_VIEW_WIDTH = 0.25
+    ZOOM_STEP = 1.25
+    SCROLL_STEP = 0.1
+
+    def __init__(self, master=None, **kwargs):
+        """
+        Инициализация.
+
+        Args:
+            master: Родительский виджет
+            **kwargs: Параметры Canvas
+        """
+        kwargs.setdefault("bg", BACKGROUND_COLOR)
+        kwargs.setdefault("highlightthickness", 0)
+        super().__init__(master, **kwargs)
+
+        self.onsets: List[float] = [0.0]
+        self.key = "C"
+        self.scale_name = "major"
+        self.view_start = 0.0
+        self.view_width = 1.0
+        # Вызывается после прокрутки или масштабирования
+        self.on_view_change: Optional[Callable[[], None]] = None
+
+        self._starts = np.zeros(1)
+        self._pitches = np.zeros(0, dtype=np.int64)
+        self._pitch_limits = (0, 1)
+        self._colors: Dict[int, str] = {}
+        self._level_colors: Dict[int, str] = {}
+        # Элементы холста видимых нот по индексу ноты
+        self._items: Dict[int, int] = {}
+        self._density = False
+        self._size = (1, 1)
+
+        self.bind("<Configure>", self._on_configure)
+        self.bind("<MouseWheel>", self._on_wheel)
+        self.bind("<Button-4>", self._on_wheel)
+        self.bind("<Button-5>", self._on_wheel)
+
+    @property
+    def total_duration(self) -> float:
+        """Общая длительность отображаемой мелодии в долях."""
+        return float(self._starts[-1])
+
+    def set_melody(
+        self,
+        melody: Melody,
+        onsets: List[float],
+        key: str = "C",
+        scale_name: str = "major",
+        keep_view: bool = False,
+    ) -> None:
+        """
+        Загружает мелодию и полностью перерисовывает пиано-ролл.
+
+        Args:
+            melody: Мелодия
+            onsets: Начала нот в долях (len(melody) + 1 значений, последнее —
+                общая длительность)
+            key: Тональность для подписей нот
+            scale_name: Название гаммы для заголовка
+            keep_view: Если True, сохраняет текущее окно, иначе показывает
+                мелодию целиком
+        """
+        self.key = key
+        self.scale_name = scale_name
+        self.onsets = onsets
+
+        self._starts = np.asarray(onsets, dtype=float)
+        self._pitches = np.array(melody.pitches, dtype=np.int64)
+        self._pitch_limits = (
+            int(self._pitches.min()) - 1,
+            int(self._pitches.max()) + 1,
+        )
+        self._colors = {}
+
+        if keep_view:
+            self.set_view(self.view_start, self.view_width)
+        else:
+            self.set_view(0.0, self.total_duration)
+
+    def set_view(self, start: float, width: float) -> None:
+        """
+        Показывает окно [start, start + width) (в долях).
+
+        Окно ограничивается длительностью мелодии.
+        """
+        total = self.total_duration
+        width = min(max(width, self.MIN_VIEW_WIDTH), max(total, self.MIN_VIEW_WIDTH))
+        start = min(max(start, 0.0), max(total - width, 0.0))
+        self.view_start = start
+        self.view_width = width
+
+        self._redraw()
+        if self.on_view_change:
+            self.on_view_change()
+
+    def scroll(self, beats: float) -> None:
+        """Сдвигает окно на beats долей (отрицательное — влево)."""
+        self.set_view(self.view_start + beats, self.view_width)
+
+    def zoom(self, factor: float, center: Optional[float] = None) -> None:
+        """
+        Масштабирует окно относительно момента center.
+
+        Args:
+            factor: Во сколько раз приблизить (меньше 1 — отдалить)
+            center: Неподвижная точка в долях; по умолчанию середина окна
+        """
+        if center is None:
+            center = self.view_start + self.view_width / 2
+        width = self.view_width / factor
+        start = center - (center - self.view_start) / factor
+        self.set_view(start, width)
+
+    def view_fraction(self) -> Tuple[float, float]:
+        """
+        Возвращает окно как доли от общей длительности (для полосы прокрутки).
+        """
+        total = self.total_duration or 1.0
+        return self.view_start / total, (self.view_start + self.view_width) / total
+
+    def visible_range(self) -> Tuple[int, int]:
+        """
+        Возвращает индексы нот [first, last), попадающих в окно.
+        """
+        count = len(self._pitches)
+        view_end = self.view_start + self.view_width
+        first = int(np.searchsorted(self._starts, self.view_start, side="right")) - 1
+        last = int(np.searchsorted(self._starts, view_end, side="left"))
+        return max(first, 0), min(last, count)
+
+    def update_notes(self, melody: Melody, start: int, stop: int) -> None:
+        """
+        Обновляет ноты с индексами [start, stop).
+
+        Если изменились длительности, stop должен быть равен числу нот
+        (сдвинулись все последующие ноты), а self.onsets — уже обновлены.
+        Если новая высота выходит за текущий диапазон, выполняется полная
+        перерисовка; иначе у видимых нот меняются только координаты и цвет.
+        """
+        pitches = melody[start:stop].pitches
+        min_pitch, max_pitch = self._pitch_limits
+        if len(pitches) and (pitches.min() <= min_pitch or pitches.max() >= max_pitch):
+            self.set_melody(
+                melody, self.onsets, self.key, self.scale_name, keep_view=True
+            )
+            return
+
+        self._pitches[start:stop] = pitches
+        new_starts = self.onsets[start : stop + 1]
+        shifted = self._starts[stop] != new_starts[-1]
+        self._starts[start : stop + 1] = new_starts
+
+        if shifted or self._density:
+            self.set_view(self.view_start, self.view_width)
+            return
+
+        for i in range(start, stop):
+            item = self._items.get(i)
+            if item is not None:
+                self.coords(item, *self._note_coords(i))
+                self.itemconfigure(item, fill=self._color(int(self._pitches[i])))
+
+    def _plot_box(self, size: Optional[Tuple[int, int]] = None):
+        """Возвращает область нот (x0, y0, x1, y1) в пикселях."""
+        width, height = size or self._size
+        x0, y0 = self.MARGIN_LEFT, self.MARGIN_TOP
+        x1 = max(width - self.MARGIN_RIGHT, x0 + 1)
+        y1 = max(height - self.MARGIN_BOTTOM, y0 + 1)
+        return x0, y0, x1, y1
+
+    def _x(self, time: float) -> float:
+        x0, _, x1, _ = self._plot_box()
+        return x0 + (time - self.view_start) * (x1 - x0) / self.view_width
+
+    def _row_height(self) -> float:
+        _, y0, _, y1 = self._plot_box()
+        min_pitch, max_pitch = self._pitch_limits
+        return (y1 - y0) / (max_pitch - min_pitch + 1)
+
+    def _y(self, pitch: int) -> float:
+        """Верхняя граница строки высоты pitch."""
+        _, y0, _, _ = self._plot_box()
+        return y0 + (self._pitch_limits[1] - pitch) * self._row_height()
+
+    def _note_coords(self, index: int) -> Tuple[float, float, float, float]:
+        """Прямоугольник ноты, обрезанный по области нот."""
+        x0, _, x1, _ = self._plot_box()
+        row = self._row_height()
+        top = self._y(int(self._pitches[index]))
+        left = max(self._x(float(self._starts[index])), x0)
+        right = min(self._x(float(self._starts[index + 1])), x1)
+        return left, top + 0.1 * row, right, top + 0.9 * row
+
+    def _color(self, pitch: int) -> str:
+        color = self._colors.get(pitch)
+        if color is None:
+            min_pitch, max_pitch = self._pitch_limits
+            value = (pitch - min_pitch) / (max_pitch - min_pitch)
+            color = self._colors[pitch] = to_hex(colormaps["viridis"](value))
+        return color
+
+    def _redraw(self) -> None:
+        """Полностью перерисовывает холст для текущего окна."""
+        self.delete("all")
+        self._items = {}
+        self._density = False
+        if not len(self._pitches):
+            return
+
+        x0, y0, x1, y1 = self._plot_box()
+        self.create_rectangle(
+            x0, y0, x1, y1, fill=AXES_COLOR, outline=SPINE_COLOR, tags="roll"
+        )
+        self.create_text(
+            self._size[0] / 2,
+            self.MARGIN_TOP / 2,
+            text=f"Пиано-ролл: {self.key} {self.scale_name}",
+            fill=TEXT_COLOR,
+            font=("Helvetica", 12, "bold"),
+            tags="title",
+        )
+
+        # Линия и подпись для каждого полутона диапазона
+        use_flats = should_use_flats(self.key)
+        row = self._row_height()
+        min_pitch, max_pitch = self._pitch_limits
+        for pitch in range(min_pitch, max_pitch + 1):
+            top = self._y(pitch)
+            if pitch != max_pitch:
+                self.create_line(x0, top, x1, top, fill=GRID_COLOR, tags="roll")
+            self.create_text(
+                x0 - 4,
+                top + row / 2,
+                text=midi_to_name(pitch, use_flats),
+                anchor="e",
+                fill=TEXT_COLOR,
+                font=("Helvetica", 8),
+                tags="ylabel",
+            )
+
+        step = self._grid_step()
+        beat = math.ceil(self.view_start / step) * step
+        while beat <= self.view_start + self.view_width:
+            x = self._x(beat)
+            self.create_line(x, y0, x, y1, fill=SPINE_COLOR, dash=(2, 4), tags="roll")
+            self.create_text(
+                x,
+                y1 + 4,
+                text=f"{beat:g}",
+                anchor="n",
+                fill=TEXT_COLOR,
+                font=("Helvetica", 8),
+                tags="xlabel",
+            )
+            beat += step
+
+        first, last = self.visible_range()
+        if (last - first) * self.MIN_NOTE_PIXELS > x1 - x0:
+            self._draw_density(first, last)
+            return
+        for i in range(first, last):
+            self._items[i] = self.create_rectangle(
+                *self._note_coords(i),
+                fill=self._color(int(self._pitches[i])),
+                outline="white",
+                tags=("roll", "note"),
+            )
+
+    def _grid_step(self) -> float:
+        """Шаг сетки долей (степень двойки), чтобы линии не сливались."""
+        x0, _, x1, _ = self._plot_box()
+        pixels_per_beat = (x1 - x0) / self.view_width
+        return max(
+            0.25, 2.0 ** math.ceil(math.log2(self.MIN_GRID_PIXELS / pixels_per_beat))
+        )
+
+    def _draw_density(self, first: int, last: int) -> None:
+        """
+        Агрегирует ноты [first, last) в сетку «высота × столбец».
+
+        Значение ячейки — доля времени столбца, в течение которой звучала
+        нота этой высоты; оно округляется вверх до одного из DENSITY_LEVELS
+        уровней и показывается цветом (viridis). Соседние ячейки строки
+        одного уровня рисуются одним прямоугольником.
+        """
+        self._density = True
+        x0, _, x1, _ = self._plot_box()
+        columns = max(int((x1 - x0) / self.DENSITY_COLUMN_PIXELS), 1)
+        min_pitch, max_pitch = self._pitch_limits
+        rows = max_pitch - min_pitch + 1
+        grid = self._density_grid(first, last, rows, columns)
+
+        levels = np.ceil(grid * self.DENSITY_LEVELS).astype(np.int64)
+        # Границы отрезков одного уровня в каждой строке
+        changes = np.diff(levels, axis=1, prepend=0, append=0) != 0
+        run_rows, bounds = np.nonzero(changes)
+        same_row = run_rows[:-1] == run_rows[1:]
+        run_rows = run_rows[:-1][same_row]
+        run_starts = bounds[:-1][same_row]
+        run_stops = bounds[1:][same_row]
+        run_levels = levels[run_rows, run_starts]
+        filled = run_levels > 0
+
+        row = self._row_height()
+        pixels = (x1 - x0) / columns
+        for r, c0, c1, level in zip(
+            run_rows[filled].tolist(),
+            run_starts[filled].tolist(),
+            run_stops[filled].tolist(),
+            run_levels[filled].tolist(),
+        ):
+            top = self._y(min_pitch + r)
+            self.create_rectangle(
+                x0 + c0 * pixels,
+                top + 0.1 * row,
+                x0 + c1 * pixels,
+                top + 0.9 * row,
+                fill=self._level_color(level),
+                width=0,
+                tags=("roll", "density"),
+            )
+
+    def _density_grid(
+        self, first: int, last: int, rows: int, columns: int
+    ) -> np.ndarray:
+        """
+        Доля времени каждого столбца, в течение которой звучала каждая
+        высота, форма (rows, columns). Нота, попавшая в несколько
+        столбцов, делится между ними по времени перекрытия.
+        """
+        min_pitch = self._pitch_limits[0]
+        step = max(1, math.ceil((last - first) / self.MAX_BINNED_NOTES))
+        column_width = self.view_width / columns
+
+        # Начала и концы нот в единицах столбцов
+        u0 = np.clip(
+            (self._starts[first:last:step] - self.view_start) / column_width,
+            0,
+            columns,
+        )
+        u1 = np.clip(
+            (self._starts[first + 1 : last + 1 : step] - self.view_start)
+            / column_width,
+            0,
+            columns,
+        )
+        pitch_rows = self._pitches[first:last:step] - min_pitch
+        c0 = np.minimum(u0.astype(np.int64), columns - 1)
+        c1 = np.minimum(u1.astype(np.int64), columns - 1)
+
+        grid = np.zeros((rows, columns + 1))
+        inside = c0 == c1
+        # Нота внутри одного столбца
+        np.add.at(grid, (pitch_rows[inside], c0[inside]), (u1 - u0)[inside] * step)
+        # Иначе — неполные крайние столбцы и полные столбцы между ними
+        span = ~inside
+        r, a, b = pitch_rows[span], c0[span], c1[span]
+        np.add.at(grid, (r, a), (a + 1 - u0[span]) * step)
+        np.add.at(grid, (r, b), (u1[span] - b) * step)
+        full = np.zeros((rows, columns + 1))
+        np.add.at(full, (r, a + 1), step)
+        np.add.at(full, (r, b), -step)
+        grid += np.cumsum(full, axis=1)
+        return np.clip(grid[:, :columns], 0.0, 1.0)
+
+    def _level_color(self, level: int) -> str:
+        """Цвет уровня доли времени звучания (1..DENSITY_LEVELS)."""
+        color = self._level_colors.get(level)
+        if color is None:
+            value = level / self.DENSITY_LEVELS
+            color = self._level_colors[level] = to_hex(colormaps["viridis"](value))
+        return color
+
+    def _on_configure(self, event) -> None:
+        """
+        Подгоняет рисунок под новый размер холста преобразованием
+        координат, без пересоздания элементов.
+        """
+        old = self._size
+        self._size = (max(event.width, 1), max(event.height, 1))
+        if not len(self._pitches):
+            return
+        if old == (1, 1):
+            self._redraw()
+            return
+
+        ox0, oy0, ox1, oy1 = self._plot_box(old)
+        _, _, nx1, ny1 = self._plot_box()
+        sx = (nx1 - ox0) / (ox1 - ox0)
+        sy = (ny1 - oy0) / (oy1 - oy0)
+        self.scale("roll", ox0, oy0, sx, sy)
+        self.scale("ylabel", ox0, oy0, 1.0, sy)
+        self.scale("xlabel", ox0, 0, sx, 1.0)
+        self.move("xlabel", 0, ny1 - oy1)
+        self.coords("title", self._size[0] / 2, self.MARGIN_TOP / 2)
+
+        # Уровень детализации зависит от ширины в пикселях
+        first, last = self.visible_range()
+        dense = (last - first) * self.MIN_NOTE_PIXELS > nx1 - ox0
+        if dense or self._density:
+            self._redraw()
+
+    def _on_wheel(self, event) -> None:
+        """Колесо мыши прокручивает окно, с Ctrl — масштабирует."""
+        if not len(self._pitches):
+            return
+        direction = 1 if event.num == 4 or event.delta > 0 else -1
+        if event.state & CONTROL_MASK:
+            x0, _, x1, _ = self._plot_box()
+            fraction = min(max((event.x - x0) / (x1 - x0), 0.0), 1.0)
+            center = self.view_start + fraction * self.view_width
+            self.zoom(self.ZOOM_STEP**direction, center=center)
+        else:
+            self.scroll(-direction * self.SCROLL_STEP * self.view_width)
@@ -0,0 +1,403 @@
+"""
+Конвейер обработки пакетов мелодий: генерация → MIDI → текст → PNG.
+
+Каждая стадия работает в своих потоках (ввод-вывод) или в своём пуле
+процессов (отрисовка) с заданным числом исполнителей. Стадии связаны
+ограниченными очередями: если стадия не успевает, предыдущие ждут, и
+память не растёт с размером пакета. Для каждой стадии собирается
+статистика: пропускная способность, время работы и глубина очереди.
+"""
+
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+from ..entities.melody import Melody
+from .melody_files import (
+    MelodySpec,
+    generate_melody,
+    write_midi,
+    write_png,
+    write_text,
+)
+
+# Признак конца потока элементов в очереди
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """
+    Стадия конвейера.
+
+    Attributes:
+        name: Название стадии (для статистики)
+        func: Функция обработки элемента; None в результате отбрасывает
+            элемент. Для стадий в процессах функция должна быть доступна
+            на уровне модуля
+        workers: Количество одновременно обрабатываемых элементов
+        processes: Если True, элементы обрабатываются в пуле процессов,
+            иначе — в потоках
+        queue_size: Размер входной очереди (по умолчанию 2 * workers)
+    """
+
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    processes: bool = False
+    queue_size: Optional[int] = None
+
+
+@dataclass
+class StageStats:
+    """
+    Статистика стадии.
+
+    Attributes:
+        name: Название стадии
+        processed: Количество обработанных элементов
+        busy: Суммарное время обработки элементов всеми исполнителями
+        seconds: Время от начала первого до конца последнего элемента
+        max_queue: Наибольшая глубина входной очереди
+        mean_queue: Средняя глубина входной очереди
+    """
+
+    name: str
+    processed: int = 0
+    busy: float = 0.0
+    seconds: float = 0.0
+    max_queue: int = 0
+    mean_queue: float = 0.0
+    _started: Optional[float] = field(default=None, repr=False)
+    _depth_sum: int = field(default=0, repr=False)
+    _samples: int = field(default=0, repr=False)
+
+    @property
+    def throughput(self) -> float:
+        """Элементов в секунду."""
+        return self.processed / self.seconds if self.seconds > 0 else 0.0
+
+    def _observe_queue(self, depth: int) -> None:
+        self._samples += 1
+        self._depth_sum += depth
+        self.max_queue = max(self.max_queue, depth)
+        self.mean_queue = self._depth_sum / self._samples
+
+    def _record(self, started: float, finished: float) -> None:
+        if self._started is None:
+            self._started = started
+        self.processed += 1
+        self.busy += finished - started
+        self.seconds = finished - self._started
+
+
+class Pipeline:
+    """Конвейер из последовательных стадий со своими пулами исполнителей."""
+
+    def __init__(self, stages: List[Stage]):
+        """
+        Args:
+            stages: Стадии в порядке обработки
+
+        Raises:
+            ValueError: Если стадий нет или число исполнителей не положительно
+        """
+        if not stages:
+            raise ValueError("Конвейер должен содержать хотя бы одну стадию")
+        for stage in stages:
+            if stage.workers < 1:
+                raise ValueError(
+                    f"Число исполнителей стадии {stage.name} должно быть "
+                    f"положительным: {stage.workers}"
+                )
+        self.stages = stages
+        self.stats: Dict[str, StageStats] = {}
+
+    def run(
+        self,
+        items: Iterable,
+        on_result: Optional[Callable[[Any], None]] = None,
+    ) -> List:
+        """
+        Прогоняет элементы через все стадии.
+
+        Элементы читаются из items лениво, поэтому items может быть
+        генератором. Порядок результатов не гарантируется.
+
+        Args:
+            items: Входные элементы первой стадии
+            on_result: Обработчик результатов последней стадии; если задан,
+                результаты передаются ему по одному (вызовы не пересекаются)
+                и не накапливаются, поэтому память не растёт с числом
+                элементов
+
+        Returns:
+            Результаты последней стадии; пустой список, если задан on_result
+
+        Raises:
+            Exception: Первая ошибка, возникшая в любой стадии; после неё
+                оставшиеся элементы не обрабатываются
+        """
+        run = _PipelineRun(self.stages, on_result)
+        self.stats = run.stats
+        return run.execute(items)
+
+
+class _PipelineRun:
+    """Состояние одного запуска конвейера: очереди, пулы и исполнители."""
+
+    def __init__(self, stages: List[Stage], on_result: Optional[Callable[[Any], None]]):
+        self.stages = stages
+        self.on_result = on_result
+        self.queues = [
+            queue.Queue(maxsize=s.queue_size or 2 * s.workers) for s in stages
+        ]
+        self.stats = {s.name: StageStats(s.name) for s in stages}
+        self.remaining = [s.workers for s in stages]
+        self.results: List = []
+        self.errors: List[BaseException] = []
+        self.abort = threading.Event()
+        self.lock = threading.Lock()
+
+    def execute(self, items: Iterable) -> List:
+        # Стадии в потоках выполняют элементы прямо в своих исполнителях;
+        # пул нужен только для стадий в процессах
+        executors: List[Optional[Executor]] = [
+            ProcessPoolExecutor(max_workers=s.workers) if s.processes else None
+            for s in self.stages
+        ]
+        threads = [
+            threading.Thread(target=self._work, args=(i, executors[i]), daemon=True)
+            for i, s in enumerate(self.stages)
+            for _ in range(s.workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            for item in items:
+                if self.abort.is_set():
+                    break
+                self.queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                self.queues[0].put(_DONE)
+            for thread in threads:
+                thread.join()
+            for executor in executors:
+                if executor is not None:
+                    executor.shutdown()
+
+        if self.errors:
+            raise self.errors[0]
+        return self.results
+
+    def _work(self, index: int, executor: Optional[Executor]) -> None:
+        """
+        Цикл исполнителя стадии: берёт элемент из входной очереди,
+        обрабатывает его (сам или в пуле процессов стадии) и передаёт
+        результат дальше. Блокирующая запись в ограниченную очередь создаёт
+        обратное давление.
+        """
+        stage = self.stages[index]
+        stats = self.stats[stage.name]
+        inbox = self.queues[index]
+        outbox = self.queues[index + 1] if index + 1 < len(self.stages) else None
+
+        while True:
+            item = inbox.get()
+            if item is _DONE:
+                break
+            with self.lock:
+                stats._observe_queue(inbox.qsize())
+            if self.abort.is_set():
+                # Элементы вычитываются без обработки, чтобы не блокировать
+                # предыдущие стадии
+                continue
+
+            started = time.perf_counter()
+            future = _call(executor, stage.func, item)
+            error = future.exception()
+            if error is not None:
+                with self.lock:
+                    self.errors.append(error)
+                self.abort.set()
+                continue
+            with self.lock:
+                stats._record(started, time.perf_counter())
+
+            result = future.result()
+            if result is None:
+                continue
+            if outbox is None:
+                with self.lock:
+                    if self.on_result is None:
+                        self.results.append(result)
+                    else:
+                        self.on_result(result)
+            else:
+                outbox.put(result)
+
+        # Последний исполнитель стадии сообщает следующей о конце потока
+        with self.lock:
+            self.remaining[index] -= 1
+            last = self.remaining[index] == 0
+        if last and outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_DONE)
+
+
+def _call(executor: Optional[Executor], func: Callable, item: Any) -> Future:
+    """
+    Обрабатывает элемент в пуле или, если пула нет, в текущем потоке.
+    В обоих случаях ошибка сохраняется в Future и пробрасывается из run().
+    """
+    if executor is not None:
+        return executor.submit(func, item)
+    future: Future = Future()
+    try:
+        future.set_result(func(item))
+    except Exception as error:  # noqa: BLE001
+        future.set_exception(error)
+    return future
+
+
+@dataclass
+class BatchReport:
+    """
+    Итог пакетного экспорта.
+
+    Сами задания и мелодии в отчёте не хранятся, чтобы память не зависела
+    от размера пакета.
+
+    Attributes:
+        count: Количество выполненных заданий
+        outputs: Пути к записанным файлам (в порядке завершения заданий)
+        stats: Статистика по стадиям
+        seconds: Общее время работы
+    """
+
+    count: int
+    outputs: List[Path]
+    stats: Dict[str, StageStats]
+    seconds: float
+
+
+@dataclass
+class ExportJob:
+    """
+    Задание на генерацию и экспорт одной мелодии.
+
+    Attributes:
+        spec: Параметры мелодии
+        output_dir: Каталог для результатов
+        melody: Мелодия (заполняется стадией генерации)
+        outputs: Пути к записанным файлам
+    """
+
+    spec: MelodySpec
+    output_dir: Path = Path(".")
+    melody: Optional[Melody] = None
+    outputs: List[Path] = field(default_factory=list)
+
+
+def generate_stage(job: ExportJob) -> ExportJob:
+    """Генерирует мелодию задания."""
+    job.melody = generate_melody(job.spec)
+    return job
+
+
+def midi_stage(job: ExportJob) -> ExportJob:
+    """Записывает MIDI файл."""
+    job.outputs.append(write_midi(job.melody, job.spec, job.output_dir))
+    return job
+
+
+def text_stage(job: ExportJob) -> ExportJob:
+    """Записывает текстовое представление мелодии."""
+    job.outputs.append(write_text(job.melody, job.spec, job.output_dir))
+    return job
+
+
+def png_stage(job: ExportJob) -> ExportJob:
+    """
+    Рисует пиано-ролл в PNG (выполняется в процессе-исполнителе).
+
+    Стадия последняя, поэтому мелодия больше не нужна и не пересылается
+    обратно из процесса.
+    """
+    job.outputs.append(write_png(job.melody, job.spec, job.output_dir))
+    job.melody = None
+    return job
+
+
+def export_pipeline(
+    render_png: bool = True,
+    io_workers: int = 2,
+    render_workers: Optional[int] = None,
+) -> Pipeline:
+    """
+    Строит конвейер генерации и экспорта мелодий (MIDI, текст, PNG).
+
+    Args:
+        render_png: Если True, добавляет стадию отрисовки пиано-роллов
+        io_workers: Число потоков для стадий записи файлов
+        render_workers: Число процессов отрисовки (по умолчанию — число ядер)
+    """
+    stages = [
+        Stage("generate", generate_stage),
+        Stage("midi", midi_stage, workers=io_workers),
+        Stage("text", text_stage, workers=io_workers),
+    ]
+    if render_png:
+        workers = render_workers or os.cpu_count() or 1
+        stages.append(Stage("png", png_stage, workers=workers, processes=True))
+    return Pipeline(stages)
+
+
+def export_batch(
+    jobs: Iterable[ExportJob],
+    output_dir: Union[str, Path],
+    render_png: bool = True,
+    io_workers: int = 2,
+    render_workers: Optional[int] = None,
+) -> BatchReport:
+    """
+    Генерирует и экспортирует пакет мелодий через конвейер.
+
+    Args:
+        jobs: Задания (output_dir заданий заменяется на output_dir)
+        output_dir: Каталог для результатов
+        render_png: Если True, дополнительно рисует пиано-роллы
+        io_workers: Число потоков для стадий записи файлов
+        render_workers: Число процессов отрисовки (по умолчанию — число ядер)
+
+    Returns:
+        Отчёт с количеством заданий, путями к файлам и статистикой стадий
+    """
+    started = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    def prepared():
+        for job in jobs:
+            job.output_dir = output_dir
+            yield job
+
+    report = BatchReport(count=0, outputs=[], stats={}, seconds=0.0)
+
+    def finished(job: ExportJob) -> None:
+        # Задание дальше не хранится: остаются только пути к файлам
+        report.count += 1
+        report.outputs.extend(job.outputs)
+
+    pipeline = export_pipeline(render_png, io_workers, render_workers)
+    pipeline.run(prepared(), on_result=finished)
+    report.stats = pipeline.stats
+    report.seconds = time.perf_counter() - started
+    return report
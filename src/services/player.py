@@ -4,11 +4,14 @@
 
 import time
 from pathlib import Path
-from typing import Union
+from typing import Optional, Union
 
 import pygame
 import pygame.midi
 
+from ..entities.melody import Melody
+from .scheduler import PortSink, RealtimeScheduler, TimingStats
+
 
 def init_player():
     """Инициализация pygame mixer для воспроизведения MIDI."""
@@ -45,3 +48,29 @@ def stop_playback():
     """Останавливает текущее воспроизведение."""
     if pygame.mixer.get_init():
         pygame.mixer.music.stop()
+
+
+def play_melody_live(
+    melody: Melody,
+    tempo: int = 120,
+    port_name: Optional[str] = None,
+) -> TimingStats:
+    """
+    Воспроизводит мелодию на MIDI выходе в реальном времени, без файла.
+
+    Для открытия порта mido нужен установленный MIDI бэкенд
+    (например, python-rtmidi).
+
+    Args:
+        melody: Мелодия
+        tempo: Темп в BPM
+        port_name: Имя выходного порта; по умолчанию — порт системы
+
+    Returns:
+        Статистика погрешности отправки событий
+    """
+    sink = PortSink(port_name)
+    try:
+        return RealtimeScheduler(sink, tempo=tempo).play(melody)
+    finally:
+        sink.close()
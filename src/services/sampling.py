@@ -0,0 +1,94 @@
+"""
+Выбор из дискретного распределения с весами методом псевдонимов (Уолкера).
+
+Таблица строится один раз за O(n); каждая выборка — O(1) независимо от
+размера словаря, в том числе при векторной выборке через numpy.
+"""
+
+from typing import Dict, List, Sequence, TypeVar
+
+import numpy as np
+
+T = TypeVar("T")
+
+
+class AliasTable:
+    """Таблица псевдонимов для выборки индексов 0..n-1 с заданными весами."""
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Строит таблицу (алгоритм Возе).
+
+        Args:
+            weights: Неотрицательные веса, хотя бы один положительный
+
+        Raises:
+            ValueError: Если веса пусты, отрицательны или все нулевые
+        """
+        n = len(weights)
+        if n == 0:
+            raise ValueError("Список весов пуст")
+        if any(w < 0 for w in weights):
+            raise ValueError(f"Веса должны быть неотрицательными: {list(weights)}")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Хотя бы один вес должен быть положительным")
+
+        scaled = [w * n / total for w in weights]
+        prob = [1.0] * n
+        alias = list(range(n))
+
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            prob[less] = scaled[less]
+            alias[less] = more
+            scaled[more] += scaled[less] - 1.0
+            (small if scaled[more] < 1.0 else large).append(more)
+
+        self.size = n
+        self.prob: List[float] = prob
+        self.alias: List[int] = alias
+        self._prob_array = np.array(prob)
+        self._alias_array = np.array(alias, dtype=np.int64)
+
+    def sample(self, rng) -> int:
+        """
+        Возвращает один индекс.
+
+        Args:
+            rng: Генератор с методами randrange и random
+                (random.Random или модуль random)
+        """
+        index = rng.randrange(self.size)
+        return index if rng.random() < self.prob[index] else self.alias[index]
+
+    def sample_array(self, size, rng: np.random.Generator) -> np.ndarray:
+        """
+        Возвращает массив индексов формы size (векторная выборка).
+
+        Args:
+            size: Форма результата (int или кортеж)
+            rng: Генератор numpy
+        """
+        index = rng.integers(0, self.size, size=size)
+        accept = rng.random(size=size) < self._prob_array[index]
+        return np.where(accept, index, self._alias_array[index])
+
+
+def weights_for(values: Sequence[T], weights: Dict[T, float]) -> List[float]:
+    """
+    Упорядочивает веса по списку значений; отсутствующим значениям — вес 1.
+
+    Raises:
+        ValueError: Если в weights есть значение не из values
+    """
+    unknown = set(weights) - set(values)
+    if unknown:
+        raise ValueError(
+            f"Веса заданы для недопустимых значений: {sorted(unknown)}. "
+            f"Допустимые: {list(values)}"
+        )
+    return [weights.get(v, 1.0) for v in values]
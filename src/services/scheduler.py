@@ -0,0 +1,242 @@
+"""
+Воспроизведение мелодий в реальном времени: отправка MIDI событий
+в выход (порт mido или запись в память) по точному расписанию.
+
+Для каждого события вычисляется абсолютный срок по монотонным часам от
+точки привязки темпа, поэтому ошибки отдельных ожиданий не накапливаются.
+Ожидание состоит из грубого сна и добивания активным циклом на последнем
+отрезке, что даёт погрешность менее миллисекунды. Смена темпа будит
+ожидающий поток, и срок события сразу пересчитывается.
+"""
+
+import statistics
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Protocol, Tuple
+
+import mido
+from mido import Message
+
+from ..entities.melody import Melody
+
+
+class MidiSink(Protocol):
+    """Получатель MIDI сообщений."""
+
+    def send(self, message: Message) -> None: ...
+
+
+class PortSink:
+    """Отправляет сообщения в MIDI порт mido."""
+
+    def __init__(self, port_name: Optional[str] = None):
+        """
+        Открывает выходной порт.
+
+        Args:
+            port_name: Имя порта; по умолчанию — порт системы по умолчанию
+        """
+        self.port = mido.open_output(port_name)
+
+    def send(self, message: Message) -> None:
+        self.port.send(message)
+
+    def close(self) -> None:
+        """Закрывает порт."""
+        self.port.close()
+
+
+class RecorderSink:
+    """Запоминает сообщения вместе со временем отправки (для тестов)."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.messages: List[Tuple[float, Message]] = []
+
+    def send(self, message: Message) -> None:
+        self.messages.append((self.clock(), message))
+
+
+@dataclass
+class TimingStats:
+    """
+    Статистика погрешности отправки событий (в секундах).
+
+    Attributes:
+        count: Количество событий
+        mean: Средняя ошибка (положительная — опоздание)
+        jitter: Стандартное отклонение ошибки
+        max_abs: Максимальная абсолютная ошибка
+        p99: 99-й перцентиль абсолютной ошибки
+    """
+
+    count: int
+    mean: float
+    jitter: float
+    max_abs: float
+    p99: float
+
+    @classmethod
+    def from_errors(cls, errors: List[float]) -> "TimingStats":
+        """Вычисляет статистику по списку ошибок."""
+        if not errors:
+            return cls(count=0, mean=0.0, jitter=0.0, max_abs=0.0, p99=0.0)
+        absolute = sorted(abs(e) for e in errors)
+        p99_index = min(len(absolute) - 1, int(0.99 * len(absolute)))
+        return cls(
+            count=len(errors),
+            mean=statistics.fmean(errors),
+            jitter=statistics.pstdev(errors),
+            max_abs=absolute[-1],
+            p99=absolute[p99_index],
+        )
+
+
+class RealtimeScheduler:
+    """
+    Планировщик MIDI событий с компенсацией дрейфа.
+
+    Темп можно менять из другого потока во время воспроизведения: точка
+    привязки переносится на текущую долю, и сроки следующих событий
+    считаются уже от неё.
+    """
+
+    # Предельная длина одного отрезка сна в секундах
+    MAX_SLEEP = 0.05
+
+    def __init__(
+        self,
+        sink: MidiSink,
+        tempo: float = 120,
+        velocity: int = 64,
+        spin_threshold: float = 0.002,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Инициализация планировщика.
+
+        Args:
+            sink: Получатель сообщений
+            tempo: Начальный темп в BPM
+            velocity: Громкость нот (0-127)
+            spin_threshold: Длина последнего отрезка ожидания (в секундах),
+                который добивается активным циклом вместо сна
+            clock: Монотонные часы в секундах
+        """
+        if tempo <= 0:
+            raise ValueError(f"Темп должен быть положительным: {tempo}")
+        self.sink = sink
+        self.velocity = velocity
+        self.spin_threshold = spin_threshold
+        self.clock = clock
+        self.errors: List[float] = []
+
+        self._tempo = float(tempo)
+        self._anchor_time = 0.0
+        self._anchor_beat = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # Будит ожидание при смене темпа или остановке
+        self._wake = threading.Event()
+
+    @property
+    def tempo(self) -> float:
+        """Текущий темп в BPM."""
+        return self._tempo
+
+    def set_tempo(self, tempo: float) -> None:
+        """
+        Меняет темп, в том числе во время воспроизведения.
+
+        Args:
+            tempo: Новый темп в BPM
+        """
+        if tempo <= 0:
+            raise ValueError(f"Темп должен быть положительным: {tempo}")
+        with self._lock:
+            now = self.clock()
+            self._anchor_beat = self._beat_at(now)
+            self._anchor_time = now
+            self._tempo = float(tempo)
+        self._wake.set()
+
+    def stop(self) -> None:
+        """Прерывает воспроизведение (можно вызвать из другого потока)."""
+        self._stop.set()
+        self._wake.set()
+
+    def stats(self) -> TimingStats:
+        """Статистика погрешности последнего воспроизведения."""
+        return TimingStats.from_errors(self.errors)
+
+    def _beat_at(self, moment: float) -> float:
+        return self._anchor_beat + (moment - self._anchor_time) * self._tempo / 60
+
+    def _deadline(self, beat: float) -> float:
+        with self._lock:
+            return self._anchor_time + (beat - self._anchor_beat) * 60 / self._tempo
+
+    def _wait_for(self, beat: float) -> float:
+        """
+        Ждёт наступления доли beat и возвращает её срок по часам.
+
+        Сон идёт отрезками не длиннее MAX_SLEEP и прерывается сменой темпа
+        или остановкой; после пробуждения срок пересчитывается. Последние
+        spin_threshold секунд добиваются активным циклом, который тоже
+        учитывает смену темпа.
+        """
+        while not self._stop.is_set():
+            # Сброс до расчёта срока: смена темпа после него прервёт сон
+            self._wake.clear()
+            remaining = self._deadline(beat) - self.clock()
+            if remaining <= self.spin_threshold:
+                break
+            self._wake.wait(min(remaining - self.spin_threshold, self.MAX_SLEEP))
+
+        deadline = self._deadline(beat)
+        while self.clock() < deadline and not self._stop.is_set():
+            if self._wake.is_set():
+                self._wake.clear()
+                deadline = self._deadline(beat)
+        return deadline
+
+    def play(self, melody: Melody) -> TimingStats:
+        """
+        Отправляет мелодию в получатель, блокируя поток до окончания.
+
+        Args:
+            melody: Мелодия
+
+        Returns:
+            Статистика погрешности отправки событий
+        """
+        events: List[Tuple[float, Message]] = []
+        beat = 0.0
+        for note in melody.notes:
+            events.append(
+                (beat, Message("note_on", note=note.pitch, velocity=self.velocity))
+            )
+            beat += note.duration
+            events.append((beat, Message("note_off", note=note.pitch, velocity=0)))
+
+        self.errors = []
+        self._stop.clear()
+        self._wake.clear()
+        with self._lock:
+            self._anchor_time = self.clock()
+            self._anchor_beat = 0.0
+
+        sounding = None
+        for beat, message in events:
+            deadline = self._wait_for(beat)
+            if self._stop.is_set():
+                break
+            self.errors.append(self.clock() - deadline)
+            self.sink.send(message)
+            sounding = message.note if message.type == "note_on" else None
+
+        if sounding is not None:
+            self.sink.send(Message("note_off", note=sounding, velocity=0))
+
+        return self.stats()
@@ -0,0 +1,235 @@
+"""
+Поиск мелодий, удовлетворяющих ограничениям, генетическим алгоритмом.
+
+Начальная популяция и мутации берутся из MelodyGenerator (те же гамма,
+октавы и веса), поэтому все кандидаты остаются в гамме. Популяция хранится
+массивами высот и длительностей, и оценка, отбор, скрещивание и мутация
+выполняются векторно над всей популяцией. Оценку можно распределить по
+пулу процессов, который создаётся один раз на весь поиск.
+"""
+
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import numpy as np
+
+from ..entities.melody import Melody
+from ..entities.scale import Scale
+from ..entities.settings import GeneratorSettings, SearchSettings
+from .generator import MelodyGenerator
+
+
+@dataclass
+class MelodyFitness:
+    """
+    Векторная функция оценки мелодий (от 0 до 1).
+
+    Оценка — взвешенное среднее трёх составляющих: доли плавных ходов,
+    окончания на тонике и соблюдения диапазона.
+
+    Attributes:
+        tonic: Звуковысотный класс тоники (0 = C)
+        settings: Настройки поиска (пороги и веса)
+    """
+
+    tonic: int
+    settings: SearchSettings
+
+    def __call__(self, pitches: np.ndarray) -> np.ndarray:
+        """
+        Оценивает популяцию.
+
+        Args:
+            pitches: Высоты нот, форма (количество мелодий, длина)
+
+        Returns:
+            Оценки, форма (количество мелодий,)
+        """
+        s = self.settings
+        pitches = np.asarray(pitches, dtype=np.int64)
+
+        if pitches.shape[1] > 1:
+            leaps = np.abs(np.diff(pitches, axis=1))
+            step = (leaps <= s.max_step).mean(axis=1)
+        else:
+            step = np.ones(len(pitches))
+
+        tonic = (pitches[:, -1] % 12 == self.tonic).astype(float)
+
+        span = pitches.max(axis=1) - pitches.min(axis=1)
+        excess = np.maximum(span - s.max_range, 0) / 12
+        in_range = np.clip(1.0 - excess, 0.0, 1.0)
+
+        total = s.step_weight + s.tonic_weight + s.range_weight
+        return (
+            s.step_weight * step + s.tonic_weight * tonic + s.range_weight * in_range
+        ) / total
+
+
+@dataclass
+class SearchResult:
+    """
+    Результат поиска.
+
+    Attributes:
+        melodies: Лучшие мелодии, лучшие первыми
+        scores: Оценки этих мелодий
+        generations: Количество выполненных поколений
+        evaluated: Сколько всего кандидатов было оценено
+        history: Лучшая оценка после каждого поколения
+    """
+
+    melodies: List[Melody]
+    scores: List[float]
+    generations: int
+    evaluated: int
+    history: List[float] = field(default_factory=list)
+
+
+class MelodySearch:
+    """
+    Генетический поиск мелодий с наилучшей оценкой MelodyFitness.
+
+    Поколение: элита переходит без изменений, остальные потомки получаются
+    одноточечным скрещиванием родителей, выбранных турниром, и мутацией —
+    заменой отдельных нот нотами из MelodyGenerator.
+    """
+
+    def __init__(
+        self,
+        scale: Scale,
+        settings: GeneratorSettings,
+        search_settings: Optional[SearchSettings] = None,
+        seed: Optional[int] = None,
+        workers: Optional[int] = 1,
+    ):
+        """
+        Инициализация поиска.
+
+        Args:
+            scale: Музыкальная гамма
+            settings: Настройки генерации мелодии
+            search_settings: Настройки поиска
+            seed: Зерно генераторов случайных чисел
+            workers: Количество процессов для оценки популяции; 1 — оценка
+                в текущем процессе, None — по числу ядер
+
+        Raises:
+            ValueError: Если настройки поиска некорректны
+        """
+        self.scale = scale
+        self.settings = settings
+        self.search_settings = search_settings or SearchSettings()
+        self.workers = workers or os.cpu_count() or 1
+
+        s = self.search_settings
+        if s.population < 2:
+            raise ValueError(f"Популяция должна быть не меньше 2: {s.population}")
+        if not 0 <= s.elite < s.population:
+            raise ValueError(
+                f"Размер элиты должен быть от 0 до {s.population - 1}: {s.elite}"
+            )
+        if s.tournament < 1:
+            raise ValueError(
+                f"Размер турнира должен быть положительным: {s.tournament}"
+            )
+
+        self.generator = MelodyGenerator(scale, settings, seed=seed)
+        self.fitness = MelodyFitness(scale.root % 12, s)
+        # Отдельный поток, не совпадающий с генератором numpy в MelodyGenerator
+        self.rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+
+    def evaluate(
+        self, pitches: np.ndarray, pool: Optional[Executor] = None
+    ) -> np.ndarray:
+        """
+        Оценивает популяцию, при наличии пула — частями в разных процессах.
+
+        Args:
+            pitches: Высоты нот, форма (количество мелодий, длина)
+            pool: Пул процессов
+        """
+        if pool is None or self.workers == 1:
+            return self.fitness(pitches)
+        chunks = np.array_split(pitches, self.workers)
+        return np.concatenate(list(pool.map(self.fitness, chunks)))
+
+    def run(self, top: int = 1) -> SearchResult:
+        """
+        Выполняет поиск.
+
+        Args:
+            top: Сколько лучших мелодий вернуть
+
+        Returns:
+            Результат поиска
+        """
+        if self.workers == 1:
+            return self._run(top, None)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            return self._run(top, pool)
+
+    def _run(self, top: int, pool: Optional[Executor]) -> SearchResult:
+        s = self.search_settings
+        pitches, durations = self.generator.sample_arrays(s.population)
+        scores = self.evaluate(pitches, pool)
+        evaluated = s.population
+        history = [float(scores.max())]
+
+        generation = 0
+        while generation < s.generations and history[-1] < s.target:
+            generation += 1
+            pitches, durations, scores = self._next_generation(
+                pitches, durations, scores, pool
+            )
+            evaluated += s.population - s.elite
+            history.append(float(scores.max()))
+
+        order = np.argsort(-scores, kind="stable")[:top]
+        return SearchResult(
+            melodies=[Melody.from_arrays(pitches[i], durations[i]) for i in order],
+            scores=[float(scores[i]) for i in order],
+            generations=generation,
+            evaluated=evaluated,
+            history=history,
+        )
+
+    def _next_generation(
+        self,
+        pitches: np.ndarray,
+        durations: np.ndarray,
+        scores: np.ndarray,
+        pool: Optional[Executor],
+    ):
+        s = self.search_settings
+        count = s.population - s.elite
+        length = pitches.shape[1]
+
+        # Турнирный отбор: для каждого родителя — лучший из случайной группы
+        groups = self.rng.integers(0, s.population, size=(2, count, s.tournament))
+        winners = np.take_along_axis(
+            groups, scores[groups].argmax(axis=2)[..., None], axis=2
+        )[..., 0]
+        first, second = winners
+
+        # Одноточечное скрещивание
+        cut = self.rng.integers(1, max(length, 2), size=count)
+        take_first = np.arange(length)[None, :] < cut[:, None]
+        child_p = np.where(take_first, pitches[first], pitches[second])
+        child_d = np.where(take_first, durations[first], durations[second])
+
+        # Мутация: замена нот случайными нотами той же гаммы
+        fresh_p, fresh_d = self.generator.sample_arrays(count)
+        mutate = self.rng.random((count, length)) < s.mutation_rate
+        child_p = np.where(mutate, fresh_p, child_p)
+        child_d = np.where(mutate, fresh_d, child_d)
+
+        elite = np.argsort(-scores, kind="stable")[: s.elite]
+        child_scores = self.evaluate(child_p, pool)
+        return (
+            np.concatenate([pitches[elite], child_p]),
+            np.concatenate([durations[elite], child_d]),
+            np.concatenate([scores[elite], child_scores]),
+        )
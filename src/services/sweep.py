@@ -0,0 +1,206 @@
+"""
+Перебор параметров генерации (тональность × гамма × темп × октавы × зерно)
+с манифестом и пропуском неизменившихся ячеек.
+
+Для каждой ячейки в манифест записываются хеш входных параметров вместе
+с версией кода, пути к результатам и время работы. При повторном запуске
+ячейка пересчитывается, только если изменился хеш или пропал один из её
+файлов — как в make.
+"""
+
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+from .melody_files import (
+    MelodySpec,
+    generate_melody,
+    write_midi,
+    write_png,
+    write_text,
+)
+
+MANIFEST_NAME = "manifest.json"
+
+SOURCE_ROOT = Path(__file__).resolve().parent.parent
+
+
+class SweepCell(MelodySpec):
+    """Одна ячейка перебора (параметры мелодии, см. MelodySpec)."""
+
+    def inputs_hash(self, code_version: str, options: Optional[Dict] = None) -> str:
+        """
+        Хеш входных параметров ячейки вместе с версией кода и опциями
+        запуска, влияющими на результаты.
+        """
+        payload = json.dumps(
+            {"inputs": asdict(self), "code": code_version, "options": options or {}},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+
+@dataclass
+class SweepReport:
+    """
+    Итог запуска перебора.
+
+    Attributes:
+        run: Имена пересчитанных ячеек
+        skipped: Имена пропущенных (неизменившихся) ячеек
+        seconds: Общее время запуска
+        manifest_path: Путь к манифесту
+    """
+
+    run: List[str] = field(default_factory=list)
+    skipped: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+    manifest_path: Optional[Path] = None
+
+
+def expand_grid(
+    keys: Iterable[str],
+    scales: Iterable[str],
+    tempos: Iterable[int],
+    octave_ranges: Iterable[int],
+    seeds: Iterable[int],
+    length: int = 8,
+) -> List[SweepCell]:
+    """
+    Раскрывает сетку параметров в список ячеек (декартово произведение).
+    """
+    return [
+        SweepCell(key, scale, tempo, octave_range, seed, length)
+        for key, scale, tempo, octave_range, seed in itertools.product(
+            keys, scales, tempos, octave_ranges, seeds
+        )
+    ]
+
+
+def code_version(root: Path = SOURCE_ROOT) -> str:
+    """
+    Возвращает хеш исходного кода пакета: изменение любого модуля
+    делает все ячейки устаревшими.
+    """
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def run_cell(cell: SweepCell, output_dir: Path, render_png: bool) -> Dict:
+    """
+    Генерирует мелодию ячейки и записывает результаты.
+
+    Returns:
+        Запись манифеста без хеша: пути к файлам и время работы
+    """
+    started = time.perf_counter()
+
+    melody = generate_melody(cell)
+    outputs = [
+        write_midi(melody, cell, output_dir),
+        write_text(melody, cell, output_dir),
+    ]
+    if render_png:
+        outputs.append(write_png(melody, cell, output_dir))
+
+    return {
+        "outputs": [p.name for p in outputs],
+        "seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+def load_manifest(path: Path) -> Dict:
+    """Читает манифест; если его нет или он повреждён — пустой."""
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"cells": {}}
+
+
+def _write_manifest(path: Path, manifest: Dict) -> None:
+    """Атомарно записывает манифест (через временный файл)."""
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(
+        json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True),
+        encoding="utf-8",
+    )
+    tmp.replace(path)
+
+
+def _is_fresh(entry: Optional[Dict], digest: str, output_dir: Path) -> bool:
+    return (
+        entry is not None
+        and entry.get("hash") == digest
+        and all((output_dir / name).exists() for name in entry.get("outputs", []))
+    )
+
+
+def run_sweep(
+    cells: Iterable[SweepCell],
+    output_dir: Union[str, Path],
+    workers: Optional[int] = None,
+    render_png: bool = False,
+    force: bool = False,
+) -> SweepReport:
+    """
+    Выполняет перебор, пересчитывая только изменившиеся ячейки.
+
+    Args:
+        cells: Ячейки перебора
+        output_dir: Каталог для результатов и манифеста
+        workers: Количество процессов (по умолчанию — число ядер)
+        render_png: Если True, дополнительно рисует пиано-роллы
+        force: Если True, пересчитывает все ячейки
+
+    Returns:
+        Отчёт о запуске
+    """
+    started = time.perf_counter()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+
+    manifest = load_manifest(manifest_path)
+    entries = manifest.setdefault("cells", {})
+    version = code_version()
+    manifest["code_version"] = version
+
+    report = SweepReport(manifest_path=manifest_path)
+    todo = {}
+    for cell in cells:
+        digest = cell.inputs_hash(version, {"png": render_png})
+        if not force and _is_fresh(entries.get(cell.name), digest, output_dir):
+            report.skipped.append(cell.name)
+        else:
+            todo[cell.name] = (cell, digest)
+
+    try:
+        if todo:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+                futures = {
+                    pool.submit(run_cell, cell, output_dir, render_png): name
+                    for name, (cell, _) in todo.items()
+                }
+                for future in as_completed(futures):
+                    name = futures[future]
+                    cell, digest = todo[name]
+                    entry = future.result()
+                    entry["hash"] = digest
+                    entry["inputs"] = asdict(cell)
+                    entries[name] = entry
+                    report.run.append(name)
+    finally:
+        # Завершённые ячейки сохраняются, даже если запуск прерван
+        _write_manifest(manifest_path, manifest)
+
+    report.seconds = time.perf_counter() - started
+    return report
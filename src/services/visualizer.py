@@ -3,12 +3,17 @@
 """
 
 from pathlib import Path
-from typing import Optional, Union
+from typing import Iterator, Optional, Tuple, Union
+from xml.sax.saxutils import escape
 
 import matplotlib.patches as mpatches
 import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.colors import to_hex
+from matplotlib.figure import Figure
 
 from ..entities.melody import Melody
+from ..entities.note import Note
 
 NOTE_NAMES_SHARP = ["C", "C#", "D", "D#", "E", "F", "F#", "G", "G#", "A", "A#", "B"]
 NOTE_NAMES_FLAT = ["C", "Db", "D", "Eb", "E", "F", "Gb", "G", "Ab", "A", "Bb", "B"]
@@ -49,6 +54,24 @@ def should_use_flats(key: str) -> bool:
     return key in FLAT_KEYS
 
 
+def format_note_line(note: Note, use_flats: bool = False) -> str:
+    """
+    Форматирует одну ноту для текстового вывода.
+
+    Args:
+        note: Нота
+        use_flats: Если True, использовать бемоли
+    """
+    name = midi_to_name(note.pitch, use_flats=use_flats)
+
+    dur = round(note.duration, 2)
+
+    # 1 доля = 4 квадрата на графике
+    blocks = max(1, int(note.duration * 4))
+
+    return f"{name}: " + "█" * blocks + f"  ({dur} долей)"
+
+
 def pretty_print_melody(melody: Melody, key: str = "C") -> str:
     """
     Красивый текстовый вывод мелодии в стиле секвенсора.
@@ -64,15 +87,7 @@ def pretty_print_melody(melody: Melody, key: str = "C") -> str:
     output.append("")
 
     for note in melody.notes:
-        name = midi_to_name(note.pitch, use_flats=use_flats)
-
-        dur = round(note.duration, 2)
-
-        # 1 доля = 4 квадрата на графике
-        blocks = max(1, int(note.duration * 4))
-
-        line = f"{name}: " + "█" * blocks + f"  ({dur} долей)"
-        output.append(line)
+        output.append(format_note_line(note, use_flats))
 
     output.append("")
     output.append(f"Общая длительность: {round(melody.total_duration(), 2)} долей")
@@ -80,6 +95,41 @@ def pretty_print_melody(melody: Melody, key: str = "C") -> str:
     return "\n".join(output)
 
 
+def _note_patch(
+    time: float, pitch: int, duration: float, color
+) -> mpatches.FancyBboxPatch:
+    """Создаёт прямоугольник ноты для пиано-ролла."""
+    return mpatches.FancyBboxPatch(
+        (time, pitch - 0.4),
+        duration,
+        0.8,
+        boxstyle="round,pad=0.02,rounding_size=0.1",
+        facecolor=color,
+        edgecolor="white",
+        linewidth=1.5,
+    )
+
+
+def _style_axes(fig: Figure, ax, key: str, scale_name: str) -> None:
+    """Оформляет оси пиано-ролла в тёмной теме приложения."""
+    ax.set_axisbelow(True)
+    ax.grid(True, axis="x", alpha=0.3, linestyle="--")
+    ax.grid(True, axis="y", alpha=0.2, linestyle="-")
+
+    ax.set_xlabel("Время (доли)", fontsize=12)
+    ax.set_ylabel("Высота", fontsize=12)
+    ax.set_title(f"Пиано-ролл: {key} {scale_name}", fontsize=14, fontweight="bold")
+
+    ax.set_facecolor("#1a1a2e")
+    fig.patch.set_facecolor("#16213e")
+    ax.tick_params(colors="white")
+    ax.xaxis.label.set_color("white")
+    ax.yaxis.label.set_color("white")
+    ax.title.set_color("white")
+    for spine in ax.spines.values():
+        spine.set_color("#4a4a6a")
+
+
 def plot_piano_roll(
     melody: Melody,
     key: str = "C",
@@ -120,18 +170,9 @@ def plot_piano_roll(
 
     pitch_range = max_pitch - min_pitch if max_pitch != min_pitch else 1
 
-    for i, (time, pitch, duration) in enumerate(zip(times, pitches, durations)):
+    for time, pitch, duration in zip(times, pitches, durations):
         color = plt.cm.viridis((pitch - min_pitch) / pitch_range)
-        rect = mpatches.FancyBboxPatch(
-            (time, pitch - 0.4),
-            duration,
-            0.8,
-            boxstyle="round,pad=0.02,rounding_size=0.1",
-            facecolor=color,
-            edgecolor="white",
-            linewidth=1.5,
-        )
-        ax.add_patch(rect)
+        ax.add_patch(_note_patch(time, pitch, duration, color))
 
     ax.set_xlim(-0.1, current_time + 0.1)
     ax.set_ylim(min_pitch - 0.5, max_pitch + 0.5)
@@ -140,22 +181,7 @@ def plot_piano_roll(
     ax.set_yticks(unique_pitches)
     ax.set_yticklabels([midi_to_name(p, use_flats) for p in unique_pitches])
 
-    ax.set_axisbelow(True)
-    ax.grid(True, axis="x", alpha=0.3, linestyle="--")
-    ax.grid(True, axis="y", alpha=0.2, linestyle="-")
-
-    ax.set_xlabel("Время (доли)", fontsize=12)
-    ax.set_ylabel("Высота", fontsize=12)
-    ax.set_title(f"Пиано-ролл: {key} {scale_name}", fontsize=14, fontweight="bold")
-
-    ax.set_facecolor("#1a1a2e")
-    fig.patch.set_facecolor("#16213e")
-    ax.tick_params(colors="white")
-    ax.xaxis.label.set_color("white")
-    ax.yaxis.label.set_color("white")
-    ax.title.set_color("white")
-    for spine in ax.spines.values():
-        spine.set_color("#4a4a6a")
+    _style_axes(fig, ax, key, scale_name)
 
     plt.tight_layout()
 
@@ -171,3 +197,139 @@ def plot_piano_roll(
         plt.close()
 
     return result
+
+
+def _svg_number(value: float) -> str:
+    """Компактная запись координаты для SVG (до сотых)."""
+    return f"{round(value, 2):.10g}"
+
+
+def _melody_chunks(
+    melody: Melody, size: int
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Перебирает высоты и длительности мелодии порциями по size нот."""
+    for start in range(0, len(melody), size):
+        part = melody[start : start + size]
+        yield part.pitches, part.durations
+
+
+def export_piano_roll_svg(
+    melody: Melody,
+    output_path: Union[str, Path],
+    key: str = "C",
+    scale_name: str = "major",
+    beat_width: float = 40.0,
+    row_height: float = 12.0,
+    chunk_size: int = 4096,
+) -> Path:
+    """
+    Сохраняет пиано-ролл мелодии в SVG без matplotlib.
+
+    Ноты записываются элементами <rect>, цвет задаётся общим CSS классом
+    для каждой высоты, сетка долей — узором. Мелодия проходится дважды
+    (границы, затем ноты) порциями по chunk_size нот, и каждая порция
+    сразу записывается в файл, поэтому память не зависит от длины мелодии.
+
+    Args:
+        melody: Мелодия
+        output_path: Путь к SVG файлу
+        key: Тональность для подписей нот
+        scale_name: Название гаммы для заголовка
+        beat_width: Ширина одной доли в пикселях
+        row_height: Высота полутона в пикселях
+        chunk_size: Количество нот в одной порции записи
+
+    Returns:
+        Путь к сохранённому файлу
+    """
+    use_flats = should_use_flats(key)
+
+    used = np.zeros(128, dtype=bool)
+    total = 0.0
+    for pitches, durations in _melody_chunks(melody, chunk_size):
+        used[pitches] = True
+        total += float(durations.sum())
+
+    pitches_used = np.flatnonzero(used).tolist() or [60]
+    min_pitch = pitches_used[0] - 1
+    max_pitch = pitches_used[-1] + 1
+    pitch_range = max_pitch - min_pitch
+
+    left, top, right, bottom = 48.0, 32.0, 8.0, 24.0
+    plot_width = total * beat_width
+    plot_height = (pitch_range + 1) * row_height
+    width = left + plot_width + right
+    height = top + plot_height + bottom
+    num = _svg_number
+
+    def y_of(pitch: int) -> float:
+        return top + (max_pitch - pitch) * row_height
+
+    styles = [
+        "text{fill:#fff;font:11px sans-serif}",
+        ".t{font-size:14px;font-weight:bold}",
+        ".n rect{stroke:#fff;stroke-width:1;rx:2px}",
+    ]
+    for pitch in pitches_used:
+        color = to_hex(plt.cm.viridis((pitch - min_pitch) / pitch_range))
+        styles.append(f".p{pitch}{{fill:{color}}}")
+
+    plot_rect = (
+        f'x="{num(left)}" y="{num(top)}" '
+        f'width="{num(plot_width)}" height="{num(plot_height)}"'
+    )
+    title = escape(f"Пиано-ролл: {key} {scale_name}")
+    header = [
+        '<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{num(width)}" height="{num(height)}">',
+        f"<style>{''.join(styles)}</style>",
+        f'<defs><pattern id="beat" width="{num(beat_width)}" '
+        f'height="{num(row_height)}" patternUnits="userSpaceOnUse" '
+        f'x="{num(left)}" y="{num(top)}">'
+        f'<path d="M0 0V{num(row_height)}" stroke="#4a4a6a" stroke-dasharray="3 3"/>'
+        f'<path d="M0 0H{num(beat_width)}" stroke="#2a2a4a"/></pattern></defs>',
+        '<rect width="100%" height="100%" fill="#16213e"/>',
+        f'<rect {plot_rect} fill="#1a1a2e"/>',
+        f'<rect {plot_rect} fill="url(#beat)"/>',
+        f'<text class="t" x="{num(width / 2)}" y="20" '
+        f'text-anchor="middle">{title}</text>',
+    ]
+    for pitch in pitches_used:
+        header.append(
+            f'<text x="{num(left - 4)}" y="{num(y_of(pitch) + row_height / 2 + 4)}" '
+            f'text-anchor="end">{midi_to_name(pitch, use_flats)}</text>'
+        )
+
+    # Общие части элементов нот: класс и вертикальное положение по высоте
+    inset = row_height * 0.1
+    rows = {
+        pitch: (
+            f'<rect class="p{pitch}" y="{num(y_of(pitch) + inset)}" '
+            f'height="{num(row_height - 2 * inset)}"'
+        )
+        for pitch in pitches_used
+    }
+    widths = {}
+
+    output_path = Path(output_path)
+    with open(output_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(header))
+        f.write('\n<g class="n">\n')
+
+        time = 0.0
+        for pitches, durations in _melody_chunks(melody, chunk_size):
+            ends = time + np.cumsum(durations)
+            xs = np.round(left + (ends - durations) * beat_width, 2).tolist()
+            time = float(ends[-1])
+
+            chunk = []
+            for pitch, duration, x in zip(pitches.tolist(), durations.tolist(), xs):
+                w = widths.get(duration)
+                if w is None:
+                    w = widths[duration] = num(duration * beat_width)
+                chunk.append(f'{rows[pitch]} x="{x:.10g}" width="{w}"/>\n')
+            f.write("".join(chunk))
+
+        f.write("</g>\n</svg>\n")
+
+    return output_path